@@ -13,12 +13,18 @@ computer!"
 
 """
 import logging
-from itertools import permutations
 from numbers import Number
 from typing import Tuple, Iterable, List, NoReturn, Dict
 from enum import IntEnum
 from dataclasses import dataclass, field
 from aoc.day_02.seed import p1
+from aoc.intcode.symbolic import find
+
+TARGET = 19_690_720
+"Output the gravity assist program should produce for part 2"
+
+INPUTS = range(100)
+"Values noun and verb can take"
 
 
 class ExecutionError(Exception):
@@ -285,12 +291,10 @@ def part_2(puzzle_input: Tuple[Number] = p1) -> Number:
     the answer would be 1202.)
 
     """
-    for (noun, verb) in permutations(range(len(p1)), 2):
-        # Create a fresh copy for each run
-        program = list(p1)
-        restore_program(memory_updates={1: noun, 2: verb}, memory=program)
-        c = Computer(program)
-        c.run_program()
-        if c.read(0) == 19_690_720:
-            return 100 * noun + verb
-    raise ExecutionError("Could not satisfy requirement")
+    # Solved from the program's polynomial in noun and verb when it only adds
+    # and multiplies, otherwise every pair (noun and verb may well be equal) is
+    # run, spread over all cores
+    match = find(puzzle_input, (1, 2), TARGET, (INPUTS, INPUTS))
+    if match is None:
+        raise ExecutionError("Could not satisfy requirement")
+    return 100 * match[1] + match[2]
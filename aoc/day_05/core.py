@@ -1,39 +1,34 @@
 """
 TODO: Day 5 desc
 """
-from collections import deque
 from numbers import Number
-from typing import Tuple, Iterable, List, NoReturn, Dict, Deque
-import logging
+from typing import Tuple, Iterable, Optional
 
 from aoc.day_05.seed import p1
-from aoc.intcode import Computer, StdIO
+from aoc.intcode import Computer, QueuedIO
+from aoc.intcode.memo import ResultCache
 
+RESULTS = ResultCache()
+"Both parts run the same program, with the same input every time"
 
-class QueuedIO(StdIO):
-    "Create fake STDOUT/STDIN using deques"
 
-    stdin: Deque
-    stdout: Deque
-
-    def __init__(self, in_: Iterable[int]) -> NoReturn:
-        self.stdin = deque(in_)
-        self.stdout = deque()
-
-    def write(self, data: int) -> NoReturn:
-        logging.debug(f"Writing to stdout {data}")
-        self.stdout.append(data)
-
-    def read(self) -> int:
-        return self.stdin.popleft()
-
-
-def run_io_program(program: Iterable[int], stdin: Iterable[int]) -> int:
+def run_io_program(
+    program: Iterable[int],
+    stdin: Iterable[int],
+    engine: str = "naive",
+    cache: Optional[ResultCache] = None,
+) -> int:
     """
     Returns the last value printed to stdout when running program with `stdin`
+
+    Runs are memoized in `cache` when given.
     """
     io = QueuedIO(stdin)
-    Computer(list(program), io=io).run_program()
+    c = Computer(list(program), io=io, engine=engine)
+    if cache is None:
+        c.run_program()
+    else:
+        cache.run(c)
     return io.stdout.pop()
 
 
@@ -42,7 +37,7 @@ def part_1(puzzle_input: Tuple[Number] = p1) -> Number:
     TODO: Day 5 pt1 desc
     """
     # Put 1 to stdin
-    return run_io_program(p1, (1,))
+    return run_io_program(p1, (1,), cache=RESULTS)
 
 
 def part_2(puzzle_input: Tuple[Number] = p1) -> Number:
@@ -50,7 +45,7 @@ def part_2(puzzle_input: Tuple[Number] = p1) -> Number:
     TODO: Day 5 pt2 desc
     """
     # Put 5 to stdin
-    return run_io_program(p1, (5,))
+    return run_io_program(p1, (5,), cache=RESULTS)
 
 
 if __name__ == "__main__":
@@ -1,20 +1,115 @@
 """
+--- Day 7: Amplification Circuit ---
+
+Based on the navigational maps, you're going to need to send more power to
+your ship's thrusters to reach Santa in time. To do this, you'll need to
+configure a series of amplifiers already installed on the ship.
+
+There are five amplifiers connected in series; each one receives an input
+signal and produces an output signal. They are connected such that the first
+amplifier's output leads to the second amplifier's input, the second
+amplifier's output leads to the third amplifier's input, and so on. The first
+amplifier's input value is 0, and the last amplifier's output leads to your
+ship's thrusters.
+
 """
-import logging
 from numbers import Number
-from typing import Tuple, Iterable, List, NoReturn, Dict
-from dataclasses import dataclass, field
-from aoc.day_0X.seed import p1
+from typing import Iterable, NoReturn, Optional, Sequence, Tuple
+
+from aoc.day_07.seed import p1
+from aoc.intcode import Computer, QueuedIO
+from aoc.intcode.compiler import CompiledProgram, compile_program
+from aoc.intcode.search import PhaseSearch
+
+SERIES_PHASES = range(5)
+FEEDBACK_PHASES = range(5, 10)
+
+
+class Amplifiers:
+    """
+    Chains of amplifiers all running the same program
+
+    Every amplifier is a resumable `Computer`, signals are passed between them
+    through their `QueuedIO`s, in one thread. The program is compiled once and
+    shared by every amplifier, and orders of phases are searched with a
+    `PhaseSearch`, which runs each distinct prefix of them only once.
+    """
 
+    program: Tuple[int, ...]
+    engine: str
+    search: PhaseSearch
+
+    def __init__(
+        self, program: Iterable[int], engine: str = "compiled"
+    ) -> NoReturn:
+        self.program = tuple(program)
+        self.engine = engine
+        self.compiled: Optional[CompiledProgram] = None
+        if engine == "compiled":
+            self.compiled = compile_program(self.program)
+        self.search = PhaseSearch(self.amplifier)
+
+    def amplifier(self, phase: int) -> Computer:
+        """Returns a new amplifier given its phase setting"""
+        return Computer(
+            list(self.program),
+            io=QueuedIO((phase,)),
+            engine=self.engine,
+            program=self.compiled,
+        )
+
+    def series(self, phases: Sequence[int], signal: int = 0) -> int:
+        """Returns the signal out of the last amplifier of a straight chain"""
+        return self.search.chain(phases, signal)
+
+    def feedback(self, phases: Sequence[int], signal: int = 0) -> int:
+        """
+        Returns the last signal out of the last amplifier of a chain whose
+        output is fed back into the first, once it has halted
+        """
+        return self.search.loop(phases, signal)
+
+    def best(
+        self, phases: Iterable[int], feedback: bool = False
+    ) -> Tuple[int, Tuple[int, ...]]:
+        """
+        Returns the highest signal out of all orders of `phases`, and the
+        order giving it
+        """
+        if feedback:
+            return self.search.feedback(tuple(phases))
+        return self.search.series(tuple(phases))
 
 
 def part_1(puzzle_input: Tuple[Number] = p1) -> Number:
     """
+    When a copy of the program starts running on an amplifier, it will first
+    use an input instruction to ask the amplifier for its current phase setting
+    (an integer from 0 to 4). Each phase setting is used exactly once. The
+    program will then call another input instruction to get the amplifier's
+    input signal, compute the correct output signal, and supply it back to the
+    amplifier with an output instruction.
+
+    Try every combination of phase settings on the amplifiers. What is the
+    highest signal that can be sent to the thrusters?
     """
-    return 0
+    return Amplifiers(puzzle_input).best(SERIES_PHASES)[0]
 
 
 def part_2(puzzle_input: Tuple[Number] = p1) -> Number:
     """
+    --- Part Two ---
+
+    Most of the amplifiers are connected as they were before; amplifier A's
+    output is connected to amplifier B's input, and so on. However, the output
+    from amplifier E is now connected into amplifier A's input. This creates
+    the feedback loop: the signal will be sent through the amplifiers many
+    times.
+
+    In feedback loop mode, the amplifiers need totally different phase
+    settings: integers from 5 to 9, again each used exactly once.
+
+    Try every combination of the new phase settings on the amplifier feedback
+    loop. What is the highest signal that can be sent to the thrusters?
     """
-    return 0
+    return Amplifiers(puzzle_input).best(FEEDBACK_PHASES, feedback=True)[0]
@@ -0,0 +1,1027 @@
+"""
+IntCode Computer WIP
+
+Currently implemented up to day 7 pt 2
+
+The core computer lives here, memory backends, compilation, scheduling,
+debugging, tracing and the rest are in submodules of this package.
+
+Ideas for future improvments
+ - Split the core out of this file too, it's still a bit large
+    - Computer
+    - Instructions?
+        - OpCode stuff
+        - Maybe create a parent instruction class handling Arguments, OpCodes
+          and execution of instruction thus seperating it from core computer.
+    - IO
+    - Addresses/Arguments
+        - ParamMode
+    - Errors
+ - Move some stuff into Computer class?
+ - Add more logging
+ - ...
+
+"""
+from collections import deque
+from collections.abc import MutableSequence
+from copy import deepcopy
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import partial
+from itertools import permutations, product, zip_longest
+from numbers import Number
+from sys import maxsize
+from time import perf_counter
+from typing import (
+    Tuple,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Dict,
+    Deque,
+    Optional,
+    Callable,
+    Set,
+    Union,
+)
+import logging
+
+from more_itertools import ilen
+
+from aoc.intcode.memory import Memory
+
+
+# Custom exceptions for error handling in intcode computer
+class ExecutionError(Exception):
+    pass
+
+
+class ExecutionFinished(Exception):
+    pass
+
+
+class AwaitingInput(Exception):
+    "Raised by IO devices with no input available, suspends the computer"
+
+
+# Classes used in IntCode Computer
+
+# Default STDIN/STDOUT implementation
+class StdIO:
+    def write(self, data: int) -> NoReturn:
+        print("STDOUT:")
+        print(data)
+
+    def read(self) -> int:
+        return int(input())
+
+
+DEFAULT_IO = StdIO()
+
+
+class QueuedIO(StdIO):
+    "Create fake STDOUT/STDIN using deques"
+
+    stdin: Deque
+    stdout: Deque
+
+    def __init__(self, in_: Iterable[int] = ()) -> NoReturn:
+        self.stdin = deque(in_)
+        self.stdout = deque()
+
+    def write(self, data: int) -> NoReturn:
+        logging.debug("Writing to stdout %s", data)
+        self.stdout.append(data)
+
+    def read(self) -> int:
+        if not self.stdin:
+            raise AwaitingInput("stdin is empty")
+        return self.stdin.popleft()
+
+
+class State(IntEnum):
+    "Execution state of a computer"
+
+    READY = 0
+    "Can run, either not started yet or stopped after output"
+
+    WAITING = 1
+    "Suspended on an input instruction until input is available"
+
+    HALTED = 2
+
+    STOPPED = 3
+    "Stopped by a `Monitor`, see `aoc.intcode.debug`, runs on when resumed"
+
+
+# OpCodes
+class OpCode(IntEnum):
+    ADD = 1
+    MUL = 2
+
+    # Day 5 pt1
+    MOVS = 3
+    OUT = 4
+    # Day 5 pt2
+    JMPT = 5
+    JMPF = 6
+    LT = 7
+    EQ = 8
+
+    HALT = 99
+
+
+class ParamMode(IntEnum):
+    "The parameter mode to use"
+
+    POSITION = 0
+    "Pass by reference"
+
+    IMMEDIATE = 1
+    "Pass by value"
+
+
+def check_code(code: int) -> NoReturn:
+    """
+    Raises a `ValueError` if `code` isn't a valid OpCode with a parameter mode
+    for each of its parameters, and none for parameters it doesn't have
+
+    Every engine decodes through this, so they all fail the same way.
+    """
+    if code < 0:
+        raise ValueError(f"{code} is not a valid OpCode")
+    op = OpCode(code % 100)
+    arity = op_table[op].arity
+    if code // 10 ** (2 + arity):
+        raise ValueError(f"{code} has modes for parameters {op.name} doesn't have")
+    for digit in str(code)[:-2]:
+        ParamMode(int(digit))
+
+
+_op_codes: Dict[int, int] = {}
+"OpCode of every code `check_code` passed, the fast engine checks each once"
+
+
+@dataclass
+class Arg:
+    val: int
+    pos: int
+    memory: List
+    mode: ParamMode = ParamMode.POSITION
+    on_write: Optional[Callable[[int], None]] = None
+    "Called with the written address after every store"
+
+    @property
+    def value(self) -> int:
+        if self.mode == ParamMode.POSITION:
+            return self.memory[self.val]
+        elif self.mode == ParamMode.IMMEDIATE:
+            return self.val
+
+    @property
+    def address(self) -> int:
+        "The cell `store` writes to"
+        if self.mode == ParamMode.POSITION:
+            return self.val
+        return self.pos
+
+    def store(self, new_value: int):
+        address = self.address
+        self.memory[address] = new_value
+        if self.on_write is not None:
+            self.on_write(address)
+
+    def __int__(self) -> int:
+        return self.value
+
+
+# Types
+Instruction = Tuple[OpCode, int, int, int]
+
+
+@dataclass
+class Address:
+    # These are currently only used for return addresses, could possible be
+    # useful for all addresses in the future
+    value: int
+    relative: bool = True
+
+    def next_addr(self, pos):
+        if self.relative:
+            return pos + self.value
+        # Absolute addressing, unsued for now but useful if we add statments
+        # Like GOTO, JMP, etc.
+        return self.value
+
+
+# Operation implementations
+def add(a: Arg, b: Arg, c: Arg, memory: List) -> Address:
+    """
+    Three arguments 1, 2, 3
+    Adds the values of pos at val(1), val(2)
+    Store in pos val(3)
+    Return: Next instruction address
+    """
+    c.store(int(a) + int(b))
+    return Address(4)
+
+
+def mul(a: Arg, b: Arg, c: Arg, memory: List) -> Address:
+    """
+    Three arguments 1, 2, 3
+    Adds the multiplies of pos at val(1), val(2)
+    Store in pos at val(3)
+    Return: Next instruction address
+    """
+    c.store(int(a) * int(b))
+    return Address(4)
+
+
+def halt(*_, **kwargs):
+    """ Program is done, finish """
+    raise ExecutionFinished("Reached halt")
+
+
+def movs(addr: Arg, memory: List, io: StdIO = DEFAULT_IO) -> Address:
+    """ Read from stdin, write to given address """
+    addr.store(int(io.read()))
+    return Address(2)
+
+
+def out(addr: Arg, memory: List, io: StdIO = DEFAULT_IO) -> Address:
+    """Write from addr to stdout"""
+    io.write(int(addr))
+    return Address(2)
+
+
+def jump_if_true(cond: Arg, addr: Arg, memory: List) -> Address:
+    """
+    jump-if-true: if the first parameter is non-zero, it sets the instruction
+    pointer to the value from the second parameter. Otherwise, it does nothing.
+    """
+    if int(cond) != 0:
+        return Address(int(addr), relative=False)
+    return Address(3)
+
+
+def jump_if_false(cond: Arg, addr: Arg, memory: List) -> Address:
+    """
+    jump-if-false: if the first parameter is zero, it sets the instruction
+    pointer to the value from the second parameter. Otherwise, it does nothing.
+    """
+    if int(cond) == 0:
+        return Address(int(addr), relative=False)
+    return Address(3)
+
+
+def less_than(a: Arg, b: Arg, addr: Arg, memory: List) -> Address:
+    """
+    less than: if the first parameter is less than the second parameter, it
+    stores 1 in the position given by the third parameter.
+    Otherwise, it stores 0.
+    """
+    addr.store(int(int(a) < int(b)))
+    return Address(4)
+
+
+def equals(a: Arg, b: Arg, addr: Arg, memory: List) -> Address:
+    """
+    equals: if the first parameter is equal to the second parameter, it stores
+    1 in the position given by the third parameter. Otherwise, it stores 0.
+    """
+    addr.store(int(int(a) == int(b)))
+    return Address(4)
+
+
+OpKey = Union[OpCode, Tuple[OpCode, OpCode]]
+"Dispatch table key, an OpCode or a fused pair of them"
+
+
+@dataclass
+class Decoded:
+    "An instruction decoded once and kept for as long as its cells are intact"
+
+    op: OpKey
+    "The OpCode, or both OpCodes of a fused pair"
+
+    modes: Tuple[ParamMode, ...]
+    arity: int
+    args: Tuple[Arg, ...]
+
+    count: int = 1
+    "Number of instructions, two for a fused pair"
+
+    @property
+    def size(self) -> int:
+        "Number of memory cells the instruction occupies"
+        return self.arity + self.count
+
+
+class DecodeCache:
+    """
+    Decoded instructions keyed by address
+
+    An entry is dropped as soon as a write lands in any of the cells it was
+    decoded from, so self modifying programs stay correct while hot loops never
+    decode the same instruction twice.
+    """
+
+    entries: Dict[int, Decoded]
+    owners: Dict[int, Set[int]]
+    "Maps every cached cell to the addresses of instructions covering it"
+
+    memory: Optional[MutableSequence]
+    "Memory the entries were decoded from, their `Arg`s read and write it"
+
+    def __init__(self) -> NoReturn:
+        self.entries = {}
+        self.owners = {}
+        self.memory = None
+
+    def get(self, address: int) -> Optional[Decoded]:
+        return self.entries.get(address)
+
+    def put(self, address: int, decoded: Decoded) -> NoReturn:
+        self.entries[address] = decoded
+        for cell in range(address, address + decoded.size):
+            self.owners.setdefault(cell, set()).add(address)
+
+    def invalidate(self, cell: int) -> NoReturn:
+        """Drops every cached instruction decoded from `cell`"""
+        for address in self.owners.pop(cell, ()):
+            decoded = self.entries.pop(address)
+            for other in range(address, address + decoded.size):
+                if other != cell:
+                    self.owners[other].discard(address)
+
+    def clear(self) -> NoReturn:
+        self.entries.clear()
+        self.owners.clear()
+
+    def follow(self, memory: MutableSequence) -> NoReturn:
+        """Drops every entry if `memory` isn't the one they were decoded from"""
+        if memory is not self.memory:
+            self.clear()
+            self.memory = memory
+
+
+# OpCode to implementation mapper
+function_map = {
+    OpCode.ADD: add,
+    OpCode.MUL: mul,
+    OpCode.MOVS: movs,
+    OpCode.OUT: out,
+    OpCode.HALT: halt,
+    OpCode.JMPT: jump_if_true,
+    OpCode.JMPF: jump_if_false,
+    OpCode.LT: less_than,
+    OpCode.EQ: equals,
+}
+
+
+@dataclass(frozen=True)
+class OpSpec:
+    "Everything dispatch needs to know about an OpCode, worked out up front"
+
+    func: Callable[..., Address]
+    arity: int
+    "Number of IntCode `Arg` parameters"
+
+    io_param: Optional[str] = None
+    "Name of the parameter external IO is injected into, if any"
+
+    @classmethod
+    def from_function(cls, func: Callable[..., Address]) -> "OpSpec":
+        """Introspects the annotations of an operation implementation"""
+        annotations = func.__annotations__.items()
+        return cls(
+            func=func,
+            arity=ilen(1 for (_, t) in annotations if t == Arg),
+            io_param=next((param for param, t in annotations if t == StdIO), None),
+        )
+
+    def bind(self, io: StdIO) -> Callable[..., Address]:
+        """Returns the implementation with external hardware injected"""
+        if self.io_param is None:
+            return self.func
+        # If we need to prepare more than IO in the future I'll break out
+        # this to a fuction taking a list of pairs (ArgType, passed_value)
+        return partial(self.func, **{self.io_param: io})
+
+
+# Annotations are only walked once, at import
+op_table: Dict[OpCode, OpSpec] = {
+    op: OpSpec.from_function(func) for (op, func) in function_map.items()
+}
+
+
+WRITES = frozenset((OpCode.ADD, OpCode.MUL, OpCode.MOVS, OpCode.LT, OpCode.EQ))
+"OpCodes storing to their last parameter"
+
+
+ARITHMETIC: Dict[OpCode, Callable[[int, int], int]] = {
+    OpCode.ADD: lambda a, b: a + b,
+    OpCode.MUL: lambda a, b: a * b,
+    OpCode.LT: lambda a, b: int(a < b),
+    OpCode.EQ: lambda a, b: int(a == b),
+}
+"What the instructions storing the result of two operands compute"
+
+
+def fuse(first: OpCode, second: OpCode) -> Callable[..., Address]:
+    """
+    Returns an implementation of the arithmetic instruction `first` directly
+    followed by `second`, arithmetic or a conditional jump
+
+    Same as running one after the other, but reading operands straight off
+    the `Arg`s and returning a single `Address`.
+    """
+    compute = ARITHMETIC[first]
+    if second in ARITHMETIC:
+        compute_second = ARITHMETIC[second]
+
+        def fused(a: Arg, b: Arg, c: Arg, d: Arg, e: Arg, f: Arg, memory: List):
+            c.store(compute(a.value, b.value))
+            f.store(compute_second(d.value, e.value))
+            return Address(8)
+
+        return fused
+
+    jump_if = second == OpCode.JMPT
+
+    def fused(a: Arg, b: Arg, c: Arg, cond: Arg, addr: Arg, memory: List):
+        c.store(compute(a.value, b.value))
+        if (cond.value != 0) == jump_if:
+            return Address(addr.value, relative=False)
+        return Address(7)
+
+    return fused
+
+
+FUSIONS = tuple(
+    product(
+        (OpCode.ADD, OpCode.MUL, OpCode.LT, OpCode.EQ),
+        (OpCode.ADD, OpCode.MUL, OpCode.LT, OpCode.EQ, OpCode.JMPT, OpCode.JMPF),
+    )
+)
+"""
+Adjacent instruction pairs the naïve engine dispatches as one, such as compare
+and branch or multiply accumulate. Only arithmetic can come first, as control
+always falls through it, and neither side does any IO.
+"""
+
+FUSES_FIRST = frozenset(first for (first, _) in FUSIONS)
+
+fused_table: Dict[Tuple[OpCode, OpCode], Callable[..., Address]] = {
+    pair: fuse(*pair) for pair in FUSIONS
+}
+
+
+ENGINES = ("naive", "fast", "compiled")
+"""
+Available execution engines, `naive` decodes into `Arg` objects, `fast`
+doesn't and `compiled` runs basic blocks compiled to Python functions
+"""
+
+
+def _fork_memory(memory: MutableSequence) -> MutableSequence:
+    """Returns an independent copy of `memory`, forking memory backends"""
+    return memory.fork() if isinstance(memory, Memory) else list(memory)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    "Frozen state of a `Computer`, see `Computer.snapshot`"
+
+    memory: MutableSequence = field(repr=False)
+    pos: int
+    io: StdIO
+    state: State = State.READY
+
+
+@dataclass
+class Computer:
+    "Naïve computer implementation"
+
+    memory: List[int]
+    "Memory shouldn't be a arbitrary iterator as we will access it by index"
+
+    io: StdIO = DEFAULT_IO
+
+    engine: str = "naive"
+    "Execution engine, one of `ENGINES`"
+
+    program: Optional["CompiledProgram"] = field(default=None, repr=False)
+    "Compiled program for the `compiled` engine, defaults to the loaded memory"
+
+    fusion: bool = True
+    "Dispatch `FUSIONS` pairs as one instruction, only used by the naïve engine"
+
+    profiler: Optional["Profiler"] = field(default=None, repr=False)
+    "Collects execution statistics when set, see `aoc.intcode.profiler`"
+
+    tracer: Optional["Tracer"] = field(default=None, repr=False)
+    "Records every executed instruction when set, see `aoc.intcode.trace`"
+
+    monitor: Optional["Monitor"] = field(default=None, repr=False)
+    "Breakpoints, watchpoints and interrupts, see `aoc.intcode.debug`"
+
+    pos: int = field(default=0, init=False)
+    "Position of current op code"
+
+    state: State = field(default=State.READY, init=False)
+
+    instructions: int = field(default=0, init=False)
+    "Number of instructions executed so far"
+
+    cache: DecodeCache = field(default_factory=DecodeCache, init=False, repr=False)
+    "Decoded instructions, see `write` when patching memory from the outside"
+
+    dispatch: Dict[OpKey, Callable[..., Address]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    "Implementations with `io` already bound, rebuilt by `attach`"
+
+    def __post_init__(self):
+        if not isinstance(self.memory, MutableSequence):
+            # PyDantic can do this automatically
+            raise ExecutionError(
+                "Incompatible memory, needs to be RAM(List) not ROM(Tuple)"
+            )
+        if self.engine not in ENGINES:
+            raise ExecutionError(
+                f"Unknown engine {self.engine!r}, use one of {ENGINES}"
+            )
+        self.attach(self.io)
+
+    def attach(self, io: StdIO) -> NoReturn:
+        """Connects `io` and binds it into the dispatch table"""
+        self.io = io
+        self.dispatch = {op: spec.bind(io) for (op, spec) in op_table.items()}
+        self.dispatch.update(fused_table)
+
+    def __parse_op_code(self, code: int, pos: int) -> Tuple[OpCode, Iterable[Arg]]:
+        check_code(code)
+        code = str(code)
+        op = OpCode(int(code[-2:]))
+        modes = (ParamMode(int(arg)) for arg in reversed(code[:-2]))
+        return op, self.get_args(op, modes, pos)
+
+    def __decode_at(self, pos: int) -> Decoded:
+        op, args = self.__parse_op_code(self.memory[pos], pos)
+        args = tuple(args)
+        return Decoded(op, tuple(arg.mode for arg in args), len(args), args)
+
+    def __fuse(self, first: Decoded) -> Decoded:
+        """Returns `first` fused with the instruction after it, if they pair up"""
+        if first.op not in FUSES_FIRST:
+            return first
+        pos = self.pos + first.size
+        if pos <= first.args[-1].address < pos + 4:
+            # First instruction patches the second (which takes at most four
+            # cells), it has to be decoded after
+            return first
+        if (second := self.cache.get(pos)) is None:
+            try:
+                second = self.__decode_at(pos)
+            except (IndexError, ValueError):
+                return first
+            # Keep it for when execution gets there, fused or not
+            self.cache.put(pos, second)
+        if (first.op, second.op) not in fused_table:
+            return first
+        return Decoded(
+            (first.op, second.op),
+            first.modes + second.modes,
+            first.arity + second.arity,
+            first.args + second.args,
+            count=2,
+        )
+
+    def __decode(self, fuse: bool = False) -> Decoded:
+        """Returns the instruction at `pos`, decoding it only on a cache miss"""
+        if (decoded := self.cache.get(self.pos)) is None:
+            decoded = self.__decode_at(self.pos)
+            if fuse:
+                decoded = self.__fuse(decoded)
+            # Fused pairs cover the cells of both, a write to either drops them
+            self.cache.put(self.pos, decoded)
+        return decoded
+
+    def get_args(
+        self, op: OpCode, param_modes: Iterable[ParamMode], pos: Optional[int] = None
+    ) -> Iterable[Arg]:
+        """Returns arguments `Arg` for given instruction (at `pos` or current)"""
+        if pos is None:
+            pos = self.pos
+        # Uses functions airty as step size and as slice size
+        arg_values = self.memory[pos + 1 : pos + 1 + op_table[op].arity]
+        if len(arg_values) < op_table[op].arity:
+            raise IndexError("Instruction runs past the end of memory")
+        return (
+            Arg(arg_val, arg_pos, self.memory, pmode, self.cache.invalidate)
+            for (pmode, (arg_pos, arg_val)) in zip_longest(
+                param_modes,
+                enumerate(arg_values, start=pos + 1),
+                fillvalue=ParamMode.POSITION,
+            )
+        )
+
+    def __instruction(self, fuse: bool = False) -> Iterator[Decoded]:
+        try:
+            yield self.__decode(fuse)
+        except IndexError:
+            # Better error incase someone loads invalid programs
+            raise ExecutionError("Invalid program, memory out of bounds")
+        except ValueError as e:
+            # Invalid OpCode, raise error
+            raise e
+
+    def __execute(self, decoded: Decoded) -> NoReturn:
+        """
+        Execute instruction, mutating memory.
+
+        Raises ProgramFinished when halt is reached.
+
+        Args:
+            decoded: The instruction (with arguments) to execute
+        """
+
+        # External hardware (keyboard and monitor for now) is already injected
+        func = self.dispatch[decoded.op]
+        self.pos = func(*decoded.args, memory=self.memory).next_addr(
+            self.pos
+        )
+
+    def __run_naive(self, until_output: bool, budget: int) -> State:
+        start = budget = maxsize if budget < 0 else budget
+        fuse = self.fusion
+        try:
+            while budget > 0 and (decoded := next(self.__instruction(fuse))):
+                budget -= decoded.count
+                self.__execute(decoded)
+                if until_output and decoded.op == OpCode.OUT:
+                    return State.READY
+        except ExecutionFinished:
+            # Program finished
+            return State.HALTED
+        except AwaitingInput:
+            # Instruction pointer is still at the input instruction, which runs
+            # again on resume
+            budget += 1
+            return State.WAITING
+        finally:
+            self.instructions += start - budget
+        # Out of budget
+        return State.READY
+
+    def __run_observed(
+        self, until_output: bool, budget: int, resume: Optional[int] = None
+    ) -> State:
+        """
+        The naïve engine, reporting every instruction to `profiler` and
+        `tracer` and checking it against the breakpoints and watchpoints of
+        `monitor`
+
+        Used whatever the engine, so counts are per instruction rather than per
+        compiled block. Whether it's needed is decided once per run, computers
+        without any of them never pay for the checks. A breakpoint at `resume`
+        doesn't stop the first instruction, it's where the computer stopped (or
+        blocked) last time.
+        """
+        from aoc.intcode.debug import Hit, Stop
+        from aoc.intcode.trace import TraceRecord
+
+        profiler = self.profiler
+        tracer = self.tracer
+        monitor = self.monitor
+        if monitor is not None and not monitor.checked:
+            monitor = None
+        breakpoints = () if monitor is None else monitor.breakpoints
+        if profiler is not None:
+            profiler.resume()
+        # Fused pairs have to be split up to be seen one instruction at a time
+        self.cache.clear()
+        start = budget
+        try:
+            while budget != 0 and (decoded := next(self.__instruction())):
+                pos = self.pos
+                if pos in breakpoints and pos != resume:
+                    executed = self.instructions + start - budget
+                    monitor.hit = Hit(Stop.BREAKPOINT, pos, executed)
+                    return State.STOPPED
+                resume = None
+                budget -= 1
+                op, args = decoded.op, decoded.args
+                if tracer is not None:
+                    code = self.memory[pos]
+                    params = tuple(arg.val for arg in args)
+                if profiler is not None and (op == OpCode.MOVS or op == OpCode.OUT):
+                    began = perf_counter()
+                    try:
+                        self.__execute(decoded)
+                    finally:
+                        profiler.io_wait += perf_counter() - began
+                else:
+                    self.__execute(decoded)
+                if profiler is not None:
+                    profiler.record(pos, op, self.pos)
+                addr = None
+                if op in WRITES and (tracer is not None or monitor is not None):
+                    addr = args[-1].address
+                if tracer is not None:
+                    if addr is None:
+                        tracer.record(TraceRecord(pos, code, params))
+                    else:
+                        tracer.record(
+                            TraceRecord(pos, code, params, addr, self.memory[addr])
+                        )
+                if until_output and op == OpCode.OUT:
+                    return State.READY
+                if monitor is not None and addr is not None:
+                    value = self.memory[addr]
+                    if monitor.triggers(addr, value):
+                        executed = self.instructions + start - budget
+                        monitor.hit = Hit(
+                            Stop.WATCHPOINT, self.pos, executed, addr, value
+                        )
+                        return State.STOPPED
+        except ExecutionFinished:
+            if profiler is not None:
+                profiler.record(self.pos, OpCode.HALT, self.pos)
+            if tracer is not None:
+                tracer.record(TraceRecord(self.pos, self.memory[self.pos], ()))
+            return State.HALTED
+        except AwaitingInput:
+            if profiler is not None:
+                profiler.suspend()
+            budget += 1
+            return State.WAITING
+        finally:
+            self.instructions += start - budget
+        return State.READY
+
+    def __run_fast(self, until_output: bool, budget: int) -> State:
+        """
+        Tight interpreter loop working directly on `memory`
+
+        Parameter modes are decoded arithmetically and operands are read and
+        written in place, no `Arg`, `Address` or cache entries are created.
+        """
+        memory = self.memory
+        io = self.io
+        pos = self.pos
+        start = budget
+        op_codes = _op_codes
+        try:
+            while budget != 0:
+                budget -= 1
+                code = memory[pos]
+                op = op_codes.get(code)
+                if op is None:
+                    # Modes are tested for zero below, anything else must fail
+                    check_code(code)
+                    op = op_codes[code] = code % 100
+                if op == 1 or op == 2 or op == 7 or op == 8:
+                    a = memory[pos + 1]
+                    if code // 100 % 10 == 0:
+                        a = memory[a]
+                    b = memory[pos + 2]
+                    if code // 1000 % 10 == 0:
+                        b = memory[b]
+                    if op == 1:
+                        value = a + b
+                    elif op == 2:
+                        value = a * b
+                    elif op == 7:
+                        value = int(a < b)
+                    else:
+                        value = int(a == b)
+                    if code // 10000 % 10 == 0:
+                        memory[memory[pos + 3]] = value
+                    else:
+                        memory[pos + 3] = value
+                    pos += 4
+                elif op == 5 or op == 6:
+                    cond = memory[pos + 1]
+                    if code // 100 % 10 == 0:
+                        cond = memory[cond]
+                    if (cond != 0) == (op == 5):
+                        pos = memory[pos + 2]
+                        if code // 1000 % 10 == 0:
+                            pos = memory[pos]
+                    else:
+                        pos += 3
+                elif op == 3:
+                    value = int(io.read())
+                    if code // 100 % 10 == 0:
+                        memory[memory[pos + 1]] = value
+                    else:
+                        memory[pos + 1] = value
+                    pos += 2
+                elif op == 4:
+                    value = memory[pos + 1]
+                    if code // 100 % 10 == 0:
+                        value = memory[value]
+                    io.write(value)
+                    pos += 2
+                    if until_output:
+                        return State.READY
+                else:
+                    # Checked, so the only one left
+                    return State.HALTED
+            return State.READY
+        except AwaitingInput:
+            budget += 1
+            return State.WAITING
+        except IndexError:
+            raise ExecutionError("Invalid program, memory out of bounds")
+        finally:
+            self.pos = pos
+            self.instructions += start - budget
+            # Memory was written behind the decode cache's back
+            self.cache.clear()
+
+    def __run_compiled(self, until_output: bool, budget: int) -> State:
+        """Runs basic blocks compiled (and cached) by `aoc.intcode.compiler`"""
+        from aoc.intcode.compiler import compile_program
+
+        if self.program is None:
+            self.program = compile_program(self.memory)
+        try:
+            state, self.pos, executed = self.program.run(
+                self.memory, self.io, self.pos, until_output, budget
+            )
+            self.instructions += executed
+        finally:
+            self.cache.clear()
+        return state
+
+    def __run(self, until_output: bool = False, max_steps: int = None) -> State:
+        # Engines count the budget down to zero, starting below zero it never
+        # runs out
+        budget = -1 if max_steps is None else max_steps
+        # Memory may have been replaced since the last run
+        self.cache.follow(self.memory)
+        monitor = self.monitor
+        checked = interrupt = False
+        resume = self.pos if self.state == State.WAITING else None
+        if monitor is not None:
+            checked = monitor.checked
+            if (stopped_at := monitor.resume()) is not None:
+                resume = stopped_at
+            if monitor.interrupt is not None:
+                remaining = max(monitor.interrupt - self.instructions, 0)
+                if budget < 0 or remaining <= budget:
+                    budget, interrupt = remaining, True
+        if checked or self.profiler is not None or self.tracer is not None:
+            self.state = self.__run_observed(until_output, budget, resume)
+        elif self.engine == "fast":
+            self.state = self.__run_fast(until_output, budget)
+        elif self.engine == "compiled":
+            self.state = self.__run_compiled(until_output, budget)
+        else:
+            self.state = self.__run_naive(until_output, budget)
+        if interrupt:
+            self.__interrupt(monitor)
+        return self.state
+
+    def __interrupt(self, monitor: "Monitor") -> NoReturn:
+        """Stops the computer if it ran up to the interrupt of `monitor`"""
+        from aoc.intcode.debug import Hit, Stop
+
+        if self.state == State.READY and self.instructions >= monitor.interrupt:
+            monitor.interrupt = None
+            monitor.hit = Hit(Stop.INTERRUPT, self.pos, self.instructions)
+            self.state = State.STOPPED
+
+    def run_program(self) -> bool:
+        """
+        Returns true if execution stops at a halt
+
+        Execution is suspended, returning false, when the program needs input
+        the IO device doesn't have yet (`AwaitingInput`). Call again to resume
+        once input is available.
+        """
+        return self.__run() == State.HALTED
+
+    def run_until_input(self) -> State:
+        """Runs until the program halts or blocks waiting for input"""
+        return self.__run()
+
+    def run_until_output(self) -> State:
+        """
+        Runs until the program has written one value, halts or blocks waiting
+        for input
+        """
+        return self.__run(until_output=True)
+
+    def run_for(self, max_steps: int) -> State:
+        """
+        Runs at most `max_steps` instructions (whole blocks for the compiled
+        engine and fused pairs for the naïve one, which may overshoot), halting
+        or blocking waiting for input
+
+        Stops in `State.READY` when running out of steps.
+        """
+        return self.__run(max_steps=max_steps)
+
+    def execute(self) -> Iterator[State]:
+        """
+        Returns a generator running the program one IO event at a time
+
+        The state is yielded after every output and whenever input is needed,
+        feed the IO device before advancing the generator again. Any number of
+        machines can be multiplexed this way in a single thread.
+        """
+        while (state := self.run_until_output()) != State.HALTED:
+            yield state
+        yield state
+
+    def rerun_program(self) -> bool:
+        """
+        Resets instruction pointer and runs program again
+
+        Memory may have been patched directly since the last run, so nothing
+        decoded then is reused.
+        """
+        self.pos = 0
+        self.state = State.READY
+        self.cache.clear()
+        return self.run_program()
+
+    def snapshot(self) -> Snapshot:
+        """
+        Returns the current memory, position and IO state
+
+        Memory backends are forked, for paged memory that means pages are
+        shared with the running machine until either side writes to them.
+        Plain lists are copied, run a `PagedMemory` to snapshot big memories
+        often. The IO device is deep copied.
+        """
+        return Snapshot(
+            memory=_fork_memory(self.memory),
+            pos=self.pos,
+            io=deepcopy(self.io),
+            state=self.state,
+        )
+
+    def restore(self, snapshot: Snapshot) -> NoReturn:
+        """Rewinds the computer to `snapshot`, which can be restored again"""
+        self.memory = _fork_memory(snapshot.memory)
+        self.pos = snapshot.pos
+        self.state = snapshot.state
+        self.cache.clear()
+        self.attach(deepcopy(snapshot.io))
+
+    def fork(self) -> "Computer":
+        """
+        Returns a new computer continuing from the current state, with the
+        same options, sharing its profiler, tracer and monitor
+        """
+        other = Computer(
+            _fork_memory(self.memory),
+            io=deepcopy(self.io),
+            engine=self.engine,
+            program=self.program,
+            fusion=self.fusion,
+            profiler=self.profiler,
+            tracer=self.tracer,
+            monitor=self.monitor,
+        )
+        other.pos = self.pos
+        other.state = self.state
+        other.instructions = self.instructions
+        return other
+
+    def read(self, memory_index: int = 0):
+        """Returns memory at given postion (or first)"""
+        return self.memory[memory_index]
+
+    def write(self, memory_index: int, value: int) -> NoReturn:
+        """
+        Stores `value` at given position
+
+        Use this rather than assigning to `memory` directly once the program
+        has run, so any instruction decoded from that cell gets invalidated.
+        """
+        self.memory[memory_index] = value
+        self.cache.invalidate(memory_index)
+
+
+def restore_program(memory_updates: Dict[int, int], memory: List[int]) -> List[int]:
+    """
+    Sets input parameters of program
+
+    Args:
+        memory_updates: A map of which places to update in memory
+        memory: The RAM module to perform the updates in
+    """
+    for (index, new_value) in memory_updates.items():
+        memory[index] = new_value
+    return memory
+
+
+# Builds on the computer above, so it's imported last
+from aoc.intcode.parallel import sweep  # noqa: E402
@@ -0,0 +1,73 @@
+"""
+Asyncio native IntCode computer
+
+`AsyncComputer` reads its input from one `asyncio.Queue` and writes output to
+another, so machines can run as coroutines on a single event loop and be wired
+into pipelines, rings or meshes simply by sharing queues between them.
+
+Before Python 3.10 a queue is bound to the event loop current when it's
+created, so machines have to be created inside the coroutine running them.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import NoReturn
+
+from aoc.intcode import Computer, ExecutionError, QueuedIO, State
+
+
+def _channel() -> asyncio.Queue:
+    """Returns a new queue, refusing to create it outside a running loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        raise ExecutionError("AsyncComputer has to be created in a coroutine")
+    return asyncio.Queue()
+
+
+@dataclass
+class AsyncComputer(Computer):
+    """
+    Computer running as a coroutine with awaitable IO channels
+
+    The program itself runs synchronously against a `QueuedIO`, values are
+    moved between it and the channels whenever execution stops. Control is
+    handed back to the event loop every `quantum` instructions so a compute
+    heavy machine can't starve the others.
+    """
+
+    io: QueuedIO = field(default_factory=QueuedIO, init=False)
+    "Only moves values to and from the channels, which are what's wired up"
+
+    stdin: asyncio.Queue = field(default_factory=_channel)
+    stdout: asyncio.Queue = field(default_factory=_channel)
+
+    quantum: int = 10_000
+    "Instructions to run before yielding to the event loop"
+
+    def __receive(self) -> NoReturn:
+        """Moves input which has already arrived over to the computer"""
+        while not self.stdin.empty():
+            self.io.stdin.append(self.stdin.get_nowait())
+
+    async def __flush(self) -> NoReturn:
+        while self.io.stdout:
+            await self.stdout.put(self.io.stdout.popleft())
+
+    async def run(self) -> bool:
+        """
+        Runs the program to completion
+
+        Returns true if execution stops at a halt (which is the only way for
+        it to stop).
+        """
+        while True:
+            self.__receive()
+            state = self.run_for(self.quantum)
+            await self.__flush()
+            if state == State.HALTED:
+                return True
+            if state == State.WAITING:
+                self.io.stdin.append(await self.stdin.get())
+            else:
+                # Out of quantum, let the other machines run
+                await asyncio.sleep(0)
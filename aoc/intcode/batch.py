@@ -0,0 +1,187 @@
+"""
+Batched IntCode execution using NumPy, install with the `batch` extra
+
+Runs many variants of one program side by side, with memory as an (N, len)
+array holding one memory image per lane. Every step executes one instruction
+on each running lane, lanes at the same OpCode are handled together by a single
+vectorized operation no matter where their instruction pointers are, so
+throughput scales with the number of lanes rather than Python iterations.
+
+Lanes that halt, run out of input or fail are retired on their own while the
+others keep going. Memory is int64, programs overflowing that are out of scope.
+"""
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import NoReturn, Optional
+
+import numpy as np
+
+from aoc.intcode import ExecutionError, OpCode, op_table
+
+
+class LaneState(IntEnum):
+    "The state of a single lane"
+
+    RUNNING = 0
+
+    HALTED = 1
+
+    WAITING = 2
+    "Tried to read input but its stdin is exhausted"
+
+    FAILED = 3
+    "Invalid OpCode or memory accessed outside of the image"
+
+
+@dataclass
+class BatchComputer:
+    "Vectorized computer running one memory image per lane"
+
+    memory: np.ndarray
+    "Memory images, one row per lane"
+
+    stdin: Optional[np.ndarray] = None
+    "Input values, one row per lane (or one value per lane)"
+
+    pos: np.ndarray = field(init=False)
+    "Position of the current op code of each lane"
+
+    state: np.ndarray = field(init=False)
+    "`LaneState` of each lane"
+
+    stdin_pos: np.ndarray = field(init=False)
+    "Number of values each lane has read"
+
+    stdout: np.ndarray = field(init=False, repr=False)
+    "Output values, see `output`"
+
+    stdout_len: np.ndarray = field(init=False)
+    "Number of values each lane has written"
+
+    def __post_init__(self):
+        self.memory = np.asarray(self.memory, dtype=np.int64)
+        if self.memory.ndim != 2:
+            raise ExecutionError("Batched memory needs to be of shape (lanes, len)")
+        lanes = self.memory.shape[0]
+        if self.stdin is None:
+            self.stdin = np.zeros((lanes, 0), dtype=np.int64)
+        self.stdin = np.asarray(self.stdin, dtype=np.int64).reshape(lanes, -1)
+
+        self.pos = np.zeros(lanes, dtype=np.int64)
+        self.state = np.full(lanes, LaneState.RUNNING, dtype=np.int8)
+        self.stdin_pos = np.zeros(lanes, dtype=np.int64)
+        self.stdout = np.zeros((lanes, 1), dtype=np.int64)
+        self.stdout_len = np.zeros(lanes, dtype=np.int64)
+
+    @property
+    def lanes(self) -> int:
+        return self.memory.shape[0]
+
+    def __retire(self, rows: np.ndarray, state: LaneState) -> NoReturn:
+        self.state[rows] = state
+
+    def __write(self, rows: np.ndarray, values: np.ndarray) -> NoReturn:
+        """Appends one value to the stdout of every lane in `rows`"""
+        needed = self.stdout_len[rows].max(initial=0) + 1
+        if needed > self.stdout.shape[1]:
+            grown = np.zeros((self.lanes, 2 * needed), dtype=np.int64)
+            grown[:, : self.stdout.shape[1]] = self.stdout
+            self.stdout = grown
+        self.stdout[rows, self.stdout_len[rows]] = values
+        self.stdout_len[rows] += 1
+
+    def __execute(self, op: OpCode, rows: np.ndarray, pos: np.ndarray) -> NoReturn:
+        """Executes `op` on all given lanes at once"""
+        width = self.memory.shape[1]
+        codes = self.memory[rows, pos]
+        arity = op_table[op].arity
+
+        # Addresses of every parameter, immediates address their own cell
+        bad = (pos + arity >= width) | (codes // 10 ** (2 + arity) != 0)
+        cells = [np.minimum(pos + 1 + i, width - 1) for i in range(arity)]
+        addrs = []
+        for (i, cell) in enumerate(cells):
+            mode = codes // 10 ** (2 + i) % 10
+            bad |= mode > 1
+            addr = np.where(mode == 0, self.memory[rows, cell], cell)
+            bad |= (addr < 0) | (addr >= width)
+            addrs.append(addr)
+
+        if bad.any():
+            self.__retire(rows[bad], LaneState.FAILED)
+            keep = ~bad
+            rows, pos = rows[keep], pos[keep]
+            addrs = [addr[keep] for addr in addrs]
+
+        def value(i: int) -> np.ndarray:
+            return self.memory[rows, addrs[i]]
+
+        if op == OpCode.ADD:
+            self.memory[rows, addrs[2]] = value(0) + value(1)
+        elif op == OpCode.MUL:
+            self.memory[rows, addrs[2]] = value(0) * value(1)
+        elif op == OpCode.LT:
+            self.memory[rows, addrs[2]] = value(0) < value(1)
+        elif op == OpCode.EQ:
+            self.memory[rows, addrs[2]] = value(0) == value(1)
+        elif op == OpCode.MOVS:
+            waiting = self.stdin_pos[rows] >= self.stdin.shape[1]
+            if waiting.any():
+                self.__retire(rows[waiting], LaneState.WAITING)
+                rows, pos = rows[~waiting], pos[~waiting]
+                addrs = [addr[~waiting] for addr in addrs]
+            self.memory[rows, addrs[0]] = self.stdin[rows, self.stdin_pos[rows]]
+            self.stdin_pos[rows] += 1
+        elif op == OpCode.OUT:
+            self.__write(rows, value(0))
+        elif op in (OpCode.JMPT, OpCode.JMPF):
+            taken = (value(0) != 0) == (op == OpCode.JMPT)
+            self.pos[rows] = np.where(taken, value(1), pos + 3)
+            return
+        elif op == OpCode.HALT:
+            self.__retire(rows, LaneState.HALTED)
+            return
+        self.pos[rows] = pos + arity + 1
+
+    def step(self) -> int:
+        """
+        Executes one instruction on every running lane
+
+        Returns the number of lanes stepped.
+        """
+        rows = np.flatnonzero(self.state == LaneState.RUNNING)
+        pos = self.pos[rows]
+        outside = (pos < 0) | (pos >= self.memory.shape[1])
+        if outside.any():
+            self.__retire(rows[outside], LaneState.FAILED)
+            rows, pos = rows[~outside], pos[~outside]
+
+        ops = self.memory[rows, pos] % 100
+        for op in np.unique(ops):
+            selected = ops == op
+            try:
+                op = OpCode(op)
+            except ValueError:
+                self.__retire(rows[selected], LaneState.FAILED)
+                continue
+            self.__execute(op, rows[selected], pos[selected])
+        return rows.size
+
+    def run_program(self, max_steps: Optional[int] = None) -> np.ndarray:
+        """
+        Steps until no lane is running (or `max_steps` is reached)
+
+        Returns a mask of the lanes which stopped at a halt.
+        """
+        steps = 0
+        while (max_steps is None or steps < max_steps) and self.step():
+            steps += 1
+        return self.state == LaneState.HALTED
+
+    def read(self, memory_index: int = 0) -> np.ndarray:
+        """Returns memory at given postion (or first) of every lane"""
+        return self.memory[:, memory_index]
+
+    def output(self, lane: int) -> np.ndarray:
+        """Returns everything `lane` has written to stdout"""
+        return self.stdout[lane, : self.stdout_len[lane]]
@@ -0,0 +1,150 @@
+"""
+Buffered IO devices for output heavy IntCode programs
+
+`BufferedIO` reads input from a buffer of 64 bit ints with a cursor, so a
+pre-filled `array` or `memoryview` (even a mapped file) is used in place, and
+collects output in a growable `array('q')`. Output is handed out in bulk with
+`read_many` and `drain`, as memoryviews of the buffer it was written to rather
+than copies.
+
+`TerminalIO` prints like `StdIO`, but in batches of many values per write.
+"""
+import sys
+from array import array
+from typing import Iterable, List, NoReturn, TextIO, Union
+
+from aoc.intcode import AwaitingInput, StdIO
+
+Buffer = Union[array, memoryview]
+Output = Union[array, memoryview, List[int]]
+
+
+def _words(values: Iterable[int]) -> Buffer:
+    """Returns `values` as 64 bit words, viewing buffers of them in place"""
+    if (isinstance(values, array) and values.typecode == "q") or (
+        isinstance(values, memoryview) and values.format == "q"
+    ):
+        return memoryview(values)
+    return array("q", values)
+
+
+class BufferedIO(StdIO):
+    """
+    IO device reading from and writing to buffers of 64 bit ints
+
+    Input handed in as an `array('q')` or `memoryview` is read in place, so
+    the caller can't resize it while the device holds it. Views returned by
+    `read_many` and `drain` stay valid, the buffers they point into are never
+    written again: output goes to a new buffer from then on. Once output
+    outgrows 64 bits it's collected in a list instead, and handed out as
+    lists.
+    """
+
+    def __init__(self, in_: Iterable[int] = ()) -> NoReturn:
+        self.__stdin: Buffer = _words(in_)
+        self.__cursor = 0
+        # Only grow input buffers created here, not ones owned by the caller
+        self.__owned = isinstance(self.__stdin, array)
+        self.__stdout: Output = array("q")
+        # Output detached by `read_many`, read up to `__taken`
+        self.__detached: Output = array("q")
+        self.__taken = 0
+
+    def __len__(self) -> int:
+        """Returns the number of unread input values"""
+        return len(self.__stdin) - self.__cursor
+
+    @property
+    def pending(self) -> int:
+        """Number of output values not read yet"""
+        return len(self.__detached) - self.__taken + len(self.__stdout)
+
+    def feed(self, values: Iterable[int]) -> NoReturn:
+        """Appends `values` to the input"""
+        if not self.__owned:
+            self.__stdin = array("q", self.__stdin[self.__cursor :])
+            self.__cursor = 0
+            self.__owned = True
+        self.__stdin.extend(values)
+
+    def read(self) -> int:
+        if self.__cursor >= len(self.__stdin):
+            raise AwaitingInput("stdin is empty")
+        value = self.__stdin[self.__cursor]
+        self.__cursor += 1
+        return value
+
+    def write(self, data: int) -> NoReturn:
+        try:
+            self.__stdout.append(data)
+        except OverflowError:
+            self.__stdout = self.__stdout.tolist()
+            self.__stdout.append(data)
+
+    def read_many(self, n: int) -> Output:
+        """Returns up to `n` output values, in the order they were written"""
+        if self.__taken >= len(self.__detached):
+            self.__detached, self.__stdout = self.__stdout, array("q")
+            self.__taken = 0
+        start = self.__taken
+        self.__taken = min(start + n, len(self.__detached))
+        if isinstance(self.__detached, list):
+            return self.__detached[start : self.__taken]
+        return memoryview(self.__detached)[start : self.__taken]
+
+    def drain(self) -> Output:
+        """Returns all output not read yet"""
+        if self.__taken < len(self.__detached) and self.__stdout:
+            # Output on both sides of the last read, has to be joined
+            rest = list(self.__detached[self.__taken :]) + list(self.__stdout)
+            try:
+                self.__detached = array("q", rest)
+            except OverflowError:
+                self.__detached = rest
+            self.__stdout = array("q")
+            self.__taken = 0
+        return self.read_many(self.pending)
+
+    def __deepcopy__(self, memo: dict) -> "BufferedIO":
+        # Views can't be copied, snapshots get buffers of their own instead
+        other = BufferedIO()
+        other.__stdin = array("q", self.__stdin[self.__cursor :])
+        other.__stdout = self.__stdout[:]
+        other.__detached = self.__detached[self.__taken :]
+        return other
+
+
+class TerminalIO(StdIO):
+    """
+    `StdIO` writing output `batch` values at a time
+
+    Buffered output is flushed before reading input, so prompts are seen, and
+    when used as a context manager on exit. Call `flush` otherwise.
+    """
+
+    def __init__(self, batch: int = 4096, stream: TextIO = None) -> NoReturn:
+        self.batch = batch
+        self.stream = stream
+        self.__buffer: List[str] = []
+
+    def write(self, data: int) -> NoReturn:
+        self.__buffer.append(f"STDOUT:\n{data}\n")
+        if len(self.__buffer) >= self.batch:
+            self.flush()
+
+    def read(self) -> int:
+        self.flush()
+        return super().read()
+
+    def flush(self) -> NoReturn:
+        if self.__buffer:
+            stream = self.stream or sys.stdout
+            stream.write("".join(self.__buffer))
+            stream.flush()
+            self.__buffer.clear()
+
+    def __enter__(self) -> "TerminalIO":
+        return self
+
+    def __exit__(self, *exc_info) -> NoReturn:
+        self.flush()
@@ -0,0 +1,425 @@
+"""
+Basic block compiler for IntCode programs
+
+Programs are split into basic blocks which are translated into Python source,
+with immediate operands and operand addresses folded in as literals, and then
+`compile()`d into one function per block. Compiled programs are cached on their
+memory image so repeated runs of an unchanged program never decode anything.
+
+Blocks are compiled lazily the first time execution reaches them, and checked
+against live memory before first use in every run. When a write lands in code
+memory the blocks covering that cell are dropped for the rest of the run and
+execution falls back to interpreting instructions one at a time, keeping self
+modifying programs correct.
+
+The static analysis of `aoc.intcode.disasm` lets blocks run straight through
+jumps which are never taken, and skips the checks for blocks made of code the
+program can't write to.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+from math import inf
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NoReturn,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from aoc.intcode import (
+    AwaitingInput,
+    ExecutionError,
+    OpCode,
+    ParamMode,
+    State,
+    StdIO,
+    check_code,
+)
+from aoc.intcode.disasm import JUMPS, WRITES, analyze, decode
+
+BlockFunction = Callable[[List[int], StdIO], Optional[int]]
+"Runs a block against memory, returns the next address or None on halt"
+
+ENDS_BLOCK = (OpCode.JMPT, OpCode.JMPF, OpCode.OUT, OpCode.HALT)
+"Instructions after which control can't fall through into the same block"
+
+
+@dataclass
+class Block:
+    "A straight line run of instructions compiled into one Python function"
+
+    start: int
+    end: int
+    "Address after the last cell of the block"
+
+    run: BlockFunction = field(repr=False)
+
+    source: str = field(repr=False)
+
+    segments: Tuple[Tuple[int, List[int]], ...] = field(repr=False)
+    "Cells the block was compiled from (minus variable ones) as (start, cells)"
+
+    writes: FrozenSet[int] = frozenset()
+    "Addresses the block stores to, always known at compile time"
+
+    code_writes: FrozenSet[int] = frozenset()
+    "The subset of `writes` landing in cells compiled into some block"
+
+    outputs: bool = False
+    "Ends by writing to stdout"
+
+    length: int = 0
+    "Number of instructions in the block"
+
+    safe: bool = False
+    "Compiled from cells the program never writes to, see `CompiledProgram.safe`"
+
+    def matches(self, memory: List[int]) -> bool:
+        """Returns true if `memory` still holds what the block was compiled from"""
+        if len(self.segments) == 1:
+            ((start, cells),) = self.segments
+            return memory[start : start + len(cells)] == cells
+        return all(
+            memory[start : start + len(cells)] == cells
+            for (start, cells) in self.segments
+        )
+
+
+class CompiledProgram:
+    """
+    Compiled blocks of one program image
+
+    Cells in `variable` are expected to differ between runs (such as the noun
+    and verb of day 2), they are never folded into the generated code but read
+    from memory when the block runs.
+    """
+
+    image: Tuple[int, ...]
+    variable: FrozenSet[int]
+
+    blocks: Dict[int, Optional[Block]]
+    "Compiled blocks by start address, None where nothing could be compiled"
+
+    owners: Dict[int, List[Block]]
+    "Blocks compiled from each cell"
+
+    writers: Dict[int, List[Block]]
+    "Blocks storing to each cell"
+
+    branches: Dict[int, bool]
+    "Conditional jumps going the same way every time, see `aoc.intcode.disasm`"
+
+    safe: FrozenSet[int]
+    "Code cells no instruction ever writes to"
+
+    def __init__(self, image: Tuple[int, ...], variable: FrozenSet[int]) -> NoReturn:
+        self.image = image
+        self.variable = variable
+        self.blocks = {}
+        self.owners = {}
+        self.writers = {}
+
+        analysis = analyze(image)
+        self.branches = {
+            pos: taken
+            for (pos, taken) in analysis.branches.items()
+            if pos + 1 not in variable and pos + 2 not in variable
+        }
+        self.safe = analysis.safe
+        for line in analysis.lines.values():
+            # Variable operands only change values read, anything else might
+            # change control flow or where writes land
+            steering = [line.pos, line.pos + line.size - 1]
+            if line.op in JUMPS:
+                steering.append(line.pos + 1)
+            if any(cell in variable for cell in steering):
+                self.safe = frozenset()
+                break
+
+    def __operand(self, cell: int, mode: ParamMode) -> str:
+        """Returns a Python expression reading the parameter stored in `cell`"""
+        if cell in self.variable:
+            return f"m[m[{cell}]]" if mode == ParamMode.POSITION else f"m[{cell}]"
+        value = self.image[cell]
+        return f"m[{value}]" if mode == ParamMode.POSITION else f"({value})"
+
+    def __target(self, cell: int, mode: ParamMode) -> int:
+        """Returns the address an instruction parameter in `cell` stores to"""
+        return self.image[cell] if mode == ParamMode.POSITION else cell
+
+    def __translate(self, op: OpCode, modes: Tuple[ParamMode, ...], pos: int) -> str:
+        """Returns the Python statements implementing one instruction"""
+        args = [self.__operand(pos + 1 + i, mode) for (i, mode) in enumerate(modes)]
+        if op in (OpCode.ADD, OpCode.MUL, OpCode.LT, OpCode.EQ):
+            a, b, _ = args
+            if op == OpCode.ADD:
+                expression = f"{a} + {b}"
+            elif op == OpCode.MUL:
+                expression = f"{a} * {b}"
+            elif op == OpCode.LT:
+                expression = f"1 if {a} < {b} else 0"
+            else:
+                expression = f"1 if {a} == {b} else 0"
+            if all(
+                mode == ParamMode.IMMEDIATE and pos + 1 + i not in self.variable
+                for (i, mode) in enumerate(modes[:2])
+            ):
+                # Fold instructions operating on immediates only
+                expression = str(eval(expression))
+            return f"m[{self.__target(pos + 3, modes[2])}] = {expression}"
+        if op == OpCode.MOVS:
+            return f"m[{self.__target(pos + 1, modes[0])}] = int(io.read())"
+        if op == OpCode.OUT:
+            return f"io.write({args[0]})\nreturn {pos + 2}"
+        if op in (OpCode.JMPT, OpCode.JMPF):
+            cond, addr = args
+            test = f"{cond} != 0" if op == OpCode.JMPT else f"{cond} == 0"
+            return f"if {test}:\n    return {addr}\nreturn {pos + 3}"
+        # Halt
+        return "return None"
+
+    def __compile(self, start: int) -> Optional[Block]:
+        """Returns the block starting at `start`, None if it can't be compiled"""
+        lines: List[str] = []
+        writes: Set[int] = set()
+        length = 0
+        pos = start
+        while pos < len(self.image) and pos not in self.variable:
+            decoded = decode(self.image[pos])
+            if decoded is None:
+                break
+            op, modes = decoded
+            size = len(modes) + 1
+            if pos + size > len(self.image):
+                break
+            if op == OpCode.MOVS and pos != start:
+                # Input may suspend execution, only allow it on block entry
+                break
+            if any(pos <= cell < pos + size for cell in writes):
+                # Earlier instruction patches this one, run it from live memory
+                break
+            if op in WRITES:
+                cell = pos + size - 1
+                if cell in self.variable and modes[-1] == ParamMode.POSITION:
+                    # Target not known until run time
+                    break
+                target = self.__target(cell, modes[-1])
+                writes.add(target)
+            length += 1
+            last = op
+            taken = self.branches.get(pos)
+            if taken is False:
+                # Never taken, carry on with the next instruction
+                pos += size
+                continue
+            if taken and modes[1] == ParamMode.IMMEDIATE:
+                lines.append(f"return {self.image[pos + 2]}")
+                pos += size
+                break
+            lines.append(self.__translate(op, modes, pos))
+            pos += size
+            if op in ENDS_BLOCK:
+                break
+        if not length:
+            return None
+        if not lines or not lines[-1].splitlines()[-1].startswith("return"):
+            lines.append(f"return {pos}")
+
+        body = "\n".join(lines).replace("\n", "\n    ")
+        source = f"def block(m, io):\n    {body}\n"
+        namespace: Dict = {}
+        exec(compile(source, f"<intcode block {start}>", "exec"), namespace)
+
+        segments, cells = [], []
+        for cell in range(start, pos):
+            if cell in self.variable:
+                continue
+            if cells and segments[-1][0] + len(cells) != cell:
+                cells = []
+            if not cells:
+                segments.append((cell, cells))
+            cells.append(self.image[cell])
+
+        return Block(
+            start=start,
+            end=pos,
+            run=namespace["block"],
+            source=source,
+            segments=tuple(segments),
+            writes=frozenset(writes),
+            outputs=last == OpCode.OUT,
+            length=length,
+            safe=all(
+                cell in self.safe
+                for cell in range(start, pos)
+                if cell not in self.variable
+            ),
+        )
+
+    def __register(self, block: Block) -> NoReturn:
+        """Records which cells `block` covers and which blocks write to them"""
+        for target in block.writes:
+            self.writers.setdefault(target, []).append(block)
+        for cell in range(block.start, block.end):
+            self.owners.setdefault(cell, []).append(block)
+        # Stores into cells now holding code have to invalidate on execution
+        for cell in range(block.start, block.end):
+            for writer in self.writers.get(cell, ()):
+                writer.code_writes = writer.code_writes | {cell}
+        block.code_writes = block.code_writes | {
+            target for target in block.writes if target in self.owners
+        }
+
+    def block(self, start: int) -> Optional[Block]:
+        """Returns the block starting at `start`, compiling it on first use"""
+        try:
+            return self.blocks[start]
+        except KeyError:
+            block = self.blocks[start] = self.__compile(start)
+            if block is not None:
+                self.__register(block)
+            return block
+
+    def run(
+        self,
+        memory: List[int],
+        io: StdIO,
+        pos: int,
+        until_output: bool = False,
+        budget: int = -1,
+    ) -> Tuple[State, int, int]:
+        """
+        Runs the program from `pos` on `memory`
+
+        Returns the state execution stopped in, the final address and the
+        number of instructions executed. A positive `budget` stops execution
+        after at least that many instructions, a negative one never runs out.
+        """
+        active: Dict[int, Block] = {}
+        "Blocks verified against memory during this run"
+
+        stale: Set[int] = set()
+        "Start of blocks compiled from cells this run has written to"
+
+        # Blocks compiled by earlier runs only have to be checked one by one
+        # when memory didn't start out as the image, or code has been patched
+        reference = list(self.image)
+        for cell in self.variable:
+            if cell < len(memory):
+                reference[cell] = memory[cell]
+        trusted = memory == reference
+
+        if budget < 0:
+            budget = inf
+        executed = 0
+
+        try:
+            while executed < budget:
+                block = active.get(pos)
+                if block is None:
+                    fresh = pos not in self.blocks
+                    block = self.block(pos)
+                    if (
+                        block is not None
+                        and ((fresh and not block.safe) or not trusted or pos in stale)
+                        and not block.matches(memory)
+                    ):
+                        # Compiled from cells written before it was, it has to
+                        # be checked again on every visit
+                        stale.add(pos)
+                        block = None
+                    if block is None:
+                        output = memory[pos] % 100 == OpCode.OUT
+                        pos, written = step(memory, pos, io)
+                        executed += 1
+                        if pos is None:
+                            return State.HALTED, written, executed
+                        if until_output and output:
+                            return State.READY, pos, executed
+                        for owner in self.owners.get(written, ()):
+                            stale.add(owner.start)
+                            active.pop(owner.start, None)
+                        continue
+                    active[pos] = block
+                next_pos = block.run(memory, io)
+                executed += block.length
+                if next_pos is None:
+                    return State.HALTED, block.end - 1, executed
+                pos = next_pos
+                for cell in block.code_writes:
+                    for owner in self.owners[cell]:
+                        stale.add(owner.start)
+                        active.pop(owner.start, None)
+                if until_output and block.outputs:
+                    return State.READY, pos, executed
+        except AwaitingInput:
+            # Input is only read on block entry (or by `step`), so nothing
+            # has been executed past `pos` yet
+            return State.WAITING, pos, executed
+        except IndexError:
+            raise ExecutionError("Invalid program, memory out of bounds")
+        return State.READY, pos, executed
+
+
+def step(memory: List[int], pos: int, io: StdIO) -> Tuple[Optional[int], int]:
+    """
+    Interprets the single instruction at `pos`
+
+    Returns the next address (None on halt) and the address written to, or
+    the halt address when halting.
+    """
+    code = memory[pos]
+    decoded = decode(code)
+    if decoded is None:
+        # Raises the same error as the other engines
+        check_code(code)
+    op, modes = decoded
+    args = [
+        memory[pos + 1 + i] if mode == ParamMode.POSITION else pos + 1 + i
+        for (i, mode) in enumerate(modes)
+    ]
+    if op == OpCode.HALT:
+        return None, pos
+    if op == OpCode.OUT:
+        io.write(memory[args[0]])
+        return pos + 2, None
+    if op in (OpCode.JMPT, OpCode.JMPF):
+        if (memory[args[0]] != 0) == (op == OpCode.JMPT):
+            return memory[args[1]], None
+        return pos + 3, None
+    if op == OpCode.MOVS:
+        memory[args[0]] = int(io.read())
+        return pos + 2, args[0]
+    a, b, target = args
+    if op == OpCode.ADD:
+        memory[target] = memory[a] + memory[b]
+    elif op == OpCode.MUL:
+        memory[target] = memory[a] * memory[b]
+    elif op == OpCode.LT:
+        memory[target] = int(memory[a] < memory[b])
+    else:
+        memory[target] = int(memory[a] == memory[b])
+    return pos + 4, target
+
+
+@lru_cache(maxsize=64)
+def _compile_program(image: Tuple[int, ...], variable: FrozenSet[int]):
+    return CompiledProgram(image, variable)
+
+
+def compile_program(
+    program: Iterable[int], variable: Iterable[int] = ()
+) -> CompiledProgram:
+    """
+    Returns the (cached) compiled form of `program`
+
+    Args:
+        program: Memory image to compile
+        variable: Addresses patched between runs, which must not be folded
+    """
+    return _compile_program(tuple(program), frozenset(variable))
@@ -0,0 +1,102 @@
+"""
+Breakpoints, watchpoints and interrupts for IntCode computers
+
+Attach a `Monitor` to a `Computer` and it stops in `State.STOPPED` before
+executing an instruction at a breakpoint address, after writing a watched cell
+(whenever it's written, or only when the value written satisfies a condition)
+or once it has executed a given number of instructions. `Monitor.hit` says why
+it stopped, the machine can then be inspected or snapshot and resumed by simply
+running it again.
+
+Only breakpoints and watchpoints need every instruction checked, and only while
+there are any the computer runs the checked (naïve) loop. An interrupt just
+caps the budget of whatever engine the computer uses, so a monitor with nothing
+but an interrupt, or with nothing set at all, costs nothing per instruction.
+"""
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Dict, NoReturn, Optional, Set
+
+Condition = Callable[[int], bool]
+
+
+class Stop(Enum):
+    "Reason for a computer to stop"
+
+    BREAKPOINT = "breakpoint"
+    WATCHPOINT = "watchpoint"
+    INTERRUPT = "interrupt"
+
+
+@dataclass(frozen=True)
+class Hit:
+    "Where and why a monitored computer stopped"
+
+    stop: Stop
+    pos: int
+    "Position of the next instruction to execute"
+
+    instructions: int
+    "Instructions executed by the computer so far"
+
+    cell: Optional[int] = None
+    "Watched cell written"
+
+    value: Optional[int] = None
+    "Value written to `cell`"
+
+
+@dataclass
+class Monitor:
+    "Conditions to stop a computer on, see the module docs"
+
+    breakpoints: Set[int] = field(default_factory=set)
+    "Addresses to stop before executing"
+
+    watchpoints: Dict[int, Optional[Condition]] = field(default_factory=dict)
+    "Cells to stop after writing, when the value written meets the condition"
+
+    interrupt: Optional[int] = None
+    "Stop once `Computer.instructions` reaches this, cleared when it fires"
+
+    hit: Optional[Hit] = None
+    "Why the computer last stopped, if it was for this monitor"
+
+    @property
+    def checked(self) -> bool:
+        """True if every instruction has to be checked"""
+        return bool(self.breakpoints or self.watchpoints)
+
+    def break_at(self, *addresses: int) -> NoReturn:
+        self.breakpoints.update(addresses)
+
+    def watch(self, cell: int, condition: Optional[Condition] = None) -> NoReturn:
+        """Stops after `cell` is written, if `condition` holds for the value"""
+        self.watchpoints[cell] = condition
+
+    def interrupt_after(self, computer: "Computer", instructions: int) -> NoReturn:
+        """Stops `computer` once it has run `instructions` more"""
+        self.interrupt = computer.instructions + instructions
+
+    def triggers(self, cell: int, value: int) -> bool:
+        """True if writing `value` to `cell` hits a watchpoint"""
+        if cell not in self.watchpoints:
+            return False
+        condition = self.watchpoints[cell]
+        return condition is None or bool(condition(value))
+
+    def resume(self) -> Optional[int]:
+        """
+        Forgets the last hit, returns its address if it was a breakpoint so
+        it doesn't stop the computer again right away
+        """
+        hit, self.hit = self.hit, None
+        if hit is not None and hit.stop == Stop.BREAKPOINT:
+            return hit.pos
+        return None
+
+    def clear(self) -> NoReturn:
+        self.breakpoints.clear()
+        self.watchpoints.clear()
+        self.interrupt = None
+        self.hit = None
@@ -0,0 +1,341 @@
+"""
+Disassembler and static analysis of IntCode programs
+
+`analyze` follows control flow from address 0 to tell code apart from data,
+recovers basic blocks and the edges between them, and finds every cell the
+reachable code can write to. From that it flags self modifying writes, folds
+arithmetic on constant operands and decides which conditional jumps always go
+the same way, and, when all control flow could be resolved, which code is dead
+and which code cells are safe to cache or compile as they're never written.
+
+Jumps through memory the program writes, and instructions the program
+patches, can't be followed statically. The analysis is then incomplete and
+stays conservative: no dead code and no safe cells are reported.
+
+Analyses are cached per program image, so repeated runs of the same program
+don't pay for them again.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from aoc.intcode import OpCode, ParamMode, op_table
+
+JUMPS = (OpCode.JMPT, OpCode.JMPF)
+
+WRITES = (OpCode.ADD, OpCode.MUL, OpCode.MOVS, OpCode.LT, OpCode.EQ)
+"Instructions storing to their last parameter"
+
+FOLDABLE = (OpCode.ADD, OpCode.MUL, OpCode.LT, OpCode.EQ)
+
+
+def decode(code: int) -> Optional[Tuple[OpCode, Tuple[ParamMode, ...]]]:
+    """Returns the OpCode and parameter modes of `code`, None if invalid"""
+    try:
+        op = OpCode(code % 100)
+        arity = op_table[op].arity
+        modes = tuple(ParamMode(code // 10 ** (2 + i) % 10) for i in range(arity))
+    except ValueError:
+        return None
+    if code // 10 ** (2 + arity):
+        # Modes given for parameters the instruction doesn't have
+        return None
+    return op, modes
+
+
+def format_instruction(memory: Sequence[int], pos: int) -> str:
+    """Returns the instruction at `pos` in assembly like form, `[n]` is by ref"""
+    try:
+        decoded = decode(memory[pos])
+    except IndexError:
+        decoded = None
+    if decoded is None:
+        return "???"
+    op, modes = decoded
+    params = []
+    for (i, mode) in enumerate(modes):
+        try:
+            value = memory[pos + 1 + i]
+        except IndexError:
+            value = "?"
+        params.append(f"[{value}]" if mode == ParamMode.POSITION else str(value))
+    return " ".join((op.name, ", ".join(params))).strip()
+
+
+@dataclass(frozen=True)
+class Line:
+    "A decoded instruction"
+
+    pos: int
+    op: OpCode
+    modes: Tuple[ParamMode, ...]
+    params: Tuple[int, ...]
+
+    @property
+    def size(self) -> int:
+        return len(self.params) + 1
+
+    @property
+    def cells(self) -> range:
+        return range(self.pos, self.pos + self.size)
+
+
+@dataclass(frozen=True)
+class BasicBlock:
+    "Straight line code, entered only at `start`"
+
+    start: int
+    end: int
+    "Address after the last cell of the block"
+
+    successors: FrozenSet[int]
+    "Blocks control can continue in"
+
+    unknown: bool = False
+    "Control may also continue somewhere not known statically"
+
+
+@dataclass(frozen=True)
+class Analysis:
+    "What can be known about a program image without running it"
+
+    image: Tuple[int, ...]
+
+    lines: Dict[int, Line]
+    "Reachable instructions by address"
+
+    blocks: Dict[int, BasicBlock]
+    "The control flow graph, basic blocks by start address"
+
+    writes: Dict[int, int]
+    "Cell written by each reachable instruction whose target is known"
+
+    dynamic_writes: FrozenSet[int]
+    "Instructions storing to a target the program itself may change"
+
+    patched: FrozenSet[int]
+    "Instructions the program may overwrite, only decoded as in the image"
+
+    self_modifying: Dict[int, int]
+    "Code cell written by each instruction writing to code"
+
+    folds: Dict[int, int]
+    "Value computed by arithmetic instructions with constant operands"
+
+    branches: Dict[int, bool]
+    "Conditional jumps which are always (True) or never (False) taken"
+
+    complete: bool
+    "All control flow could be resolved and all write targets are known"
+
+    dead: FrozenSet[int]
+    "Instructions outside of the reachable code, empty when incomplete"
+
+    safe: FrozenSet[int]
+    "Reachable code cells which are never written, empty when incomplete"
+
+    def listing(self) -> str:
+        """Returns the program as text, reachable code decoded and rest as data"""
+        lines = []
+        data: List[int] = []
+        pos = 0
+
+        def flush():
+            if data:
+                start = pos - len(data)
+                lines.append(f"{start:>6}  DATA {', '.join(map(str, data))}")
+                data.clear()
+
+        while pos < len(self.image):
+            line = self.lines.get(pos)
+            if line is None:
+                data.append(self.image[pos])
+                pos += 1
+                if len(data) == 8:
+                    flush()
+                continue
+            flush()
+            notes = []
+            if pos in self.folds:
+                notes.append(f"= {self.folds[pos]}")
+            if pos in self.branches:
+                notes.append("always taken" if self.branches[pos] else "never taken")
+            if pos in self.self_modifying:
+                notes.append(f"writes code at {self.self_modifying[pos]}")
+            if pos in self.patched:
+                notes.append("patched at run time")
+            if pos in self.blocks:
+                lines.append(f"{pos:>6}:")
+            text = f"{pos:>6}  {format_instruction(self.image, pos)}"
+            if notes:
+                text = f"{text:<40} ; {'; '.join(notes)}"
+            lines.append(text)
+            pos += line.size
+        flush()
+        return "\n".join(lines)
+
+
+def _sweep(image: Tuple[int, ...]) -> Iterable[Line]:
+    """Decodes instructions linearly from 0, skipping single invalid cells"""
+    pos = 0
+    while pos < len(image):
+        decoded = decode(image[pos])
+        if decoded is None or pos + len(decoded[1]) >= len(image):
+            pos += 1
+            continue
+        op, modes = decoded
+        yield Line(pos, op, modes, image[pos + 1 : pos + 1 + len(modes)])
+        pos += len(modes) + 1
+
+
+def _analyze(image: Tuple[int, ...]) -> Analysis:
+    # Writes make more cells non constant, which can change what's reachable,
+    # so repeat until the set of written cells stops growing
+    written: Set[int] = set()
+    while True:
+        lines: Dict[int, Line] = {}
+        successors: Dict[int, Set[int]] = {}
+        unknown: Set[int] = set()
+        patched: Set[int] = set()
+        writes: Dict[int, int] = {}
+        dynamic: Set[int] = set()
+        folds: Dict[int, int] = {}
+        branches: Dict[int, bool] = {}
+
+        def constant(cell: int, mode: ParamMode) -> Optional[int]:
+            """Returns the value of an immediate parameter nothing writes to"""
+            if mode == ParamMode.IMMEDIATE and cell not in written:
+                return image[cell]
+            return None
+
+        pending = [0]
+        while pending:
+            pos = pending.pop()
+            if pos in lines or not 0 <= pos < len(image):
+                continue
+            decoded = decode(image[pos])
+            if decoded is None or pos + len(decoded[1]) >= len(image):
+                # Running into invalid code is an error at run time
+                continue
+            op, modes = decoded
+            params = image[pos + 1 : pos + 1 + len(modes)]
+            line = lines[pos] = Line(pos, op, modes, params)
+            following = successors[pos] = set()
+            if any(cell in written for cell in line.cells):
+                # Can't tell what this will be decoded as when executed
+                patched.add(pos)
+                unknown.add(pos)
+                continue
+            if op in WRITES:
+                cell = pos + len(modes)
+                if modes[-1] == ParamMode.IMMEDIATE:
+                    writes[pos] = cell
+                elif cell in written:
+                    dynamic.add(pos)
+                else:
+                    writes[pos] = image[cell]
+            if op in FOLDABLE:
+                a, b = (constant(pos + 1 + i, modes[i]) for i in range(2))
+                if a is not None and b is not None:
+                    folds[pos] = {
+                        OpCode.ADD: a + b,
+                        OpCode.MUL: a * b,
+                        OpCode.LT: int(a < b),
+                        OpCode.EQ: int(a == b),
+                    }[op]
+            if op in JUMPS:
+                cond = constant(pos + 1, modes[0])
+                target = constant(pos + 2, modes[1])
+                if cond is not None:
+                    branches[pos] = (cond != 0) == (op == OpCode.JMPT)
+                if branches.get(pos) is not False:
+                    if target is None:
+                        unknown.add(pos)
+                    else:
+                        following.add(target)
+                if branches.get(pos) is not True:
+                    following.add(pos + line.size)
+            elif op != OpCode.HALT:
+                following.add(pos + line.size)
+            pending.extend(following)
+
+        grown = written | set(writes.values())
+        if grown == written:
+            break
+        written = grown
+
+    code = {cell for line in lines.values() for cell in line.cells}
+    complete = not unknown and not dynamic
+    dead: FrozenSet[int] = frozenset()
+    safe: FrozenSet[int] = frozenset()
+    if complete:
+        dead = frozenset(
+            line.pos
+            for line in _sweep(image)
+            if not any(cell in code for cell in line.cells)
+        )
+        safe = frozenset(code - written)
+
+    return Analysis(
+        image=image,
+        lines=lines,
+        blocks=_blocks(lines, successors, unknown),
+        writes=writes,
+        dynamic_writes=frozenset(dynamic),
+        patched=frozenset(patched),
+        self_modifying={
+            pos: target for (pos, target) in writes.items() if target in code
+        },
+        folds=folds,
+        branches=branches,
+        complete=complete,
+        dead=dead,
+        safe=safe,
+    )
+
+
+def _blocks(
+    lines: Dict[int, Line], successors: Dict[int, Set[int]], unknown: Set[int]
+) -> Dict[int, BasicBlock]:
+    """Groups reachable instructions into basic blocks"""
+    leaders = {0}
+    for (pos, line) in lines.items():
+        if line.op in JUMPS or line.op == OpCode.HALT or pos in unknown:
+            leaders |= successors[pos]
+            leaders.add(pos + line.size)
+        elif any(target != pos + line.size for target in successors[pos]):
+            leaders |= successors[pos]
+    leaders &= lines.keys()
+
+    blocks = {}
+    for start in leaders:
+        pos = start
+        while True:
+            line = lines[pos]
+            following = pos + line.size
+            ends = line.op in JUMPS or line.op == OpCode.HALT or pos in unknown
+            if ends or following in leaders or following not in lines:
+                break
+            pos = following
+        blocks[start] = BasicBlock(
+            start=start,
+            end=pos + lines[pos].size,
+            successors=frozenset(successors[pos]),
+            unknown=pos in unknown,
+        )
+    return blocks
+
+
+@lru_cache(maxsize=64)
+def _cached_analysis(image: Tuple[int, ...]) -> Analysis:
+    return _analyze(image)
+
+
+def analyze(program: Iterable[int]) -> Analysis:
+    """Returns the (cached) static analysis of a program image"""
+    return _cached_analysis(tuple(program))
+
+
+def disassemble(program: Iterable[int]) -> str:
+    """Returns a listing of `program`, see `Analysis.listing`"""
+    return analyze(program).listing()
@@ -0,0 +1,364 @@
+"""
+Sharded fleets of IntCode computers across worker processes
+
+A `Fleet` partitions its machines over a number of shards, one worker process
+each, where they're run by a local `Scheduler`. Output of a machine is routed
+to the input of another (see `Fleet.connect`): directly when both live on the
+same shard, and otherwise through a ring buffer in shared memory, one for every
+ordered pair of shards. Messages never get pickled, they're written to the
+rings as (machine, value) pairs of 64 bit ints.
+
+Placement keeps machines which talk to each other on the same shard as far as
+balancing the shards allows, so most traffic never leaves a process.
+
+The fleet has finished when every shard is idle, with all its machines halted
+or parked on input, and every message sent has been received.
+"""
+from collections import deque
+from dataclasses import dataclass
+from math import ceil
+from multiprocessing import Process, Queue
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from time import sleep
+from typing import Deque, Dict, List, NoReturn, Optional, Tuple
+
+from aoc.intcode import Computer, ExecutionError, QueuedIO, State
+from aoc.intcode.scheduler import Scheduler
+
+WORD = 8
+"Bytes per shared memory word, everything is stored as int64"
+
+STATUS = 3
+"Words of status per shard: messages sent, messages received and idle flag"
+
+
+class RingBuffer:
+    """
+    Single producer single consumer queue of (machine, value) pairs
+
+    Lives in a buffer of `RingBuffer.words(capacity)` int64s, the first two
+    words count messages read and written so far, followed by the slots. Each
+    counter is only ever written by one side and a slot is always filled before
+    the write counter moves past it.
+    """
+
+    capacity: int
+
+    def __init__(self, buffer: memoryview, capacity: int) -> NoReturn:
+        self.capacity = capacity
+        self.__words = buffer
+
+    @staticmethod
+    def words(capacity: int) -> int:
+        return 2 + 2 * capacity
+
+    def __len__(self) -> int:
+        return self.__words[1] - self.__words[0]
+
+    def put(self, machine: int, value: int) -> bool:
+        """Adds a message, returns false if the buffer is full"""
+        words = self.__words
+        tail = words[1]
+        if tail - words[0] >= self.capacity:
+            return False
+        slot = 2 + 2 * (tail % self.capacity)
+        try:
+            words[slot] = machine
+            words[slot + 1] = value
+        except (OverflowError, ValueError):
+            raise ExecutionError(f"Message {value} doesn't fit in 64 bits")
+        words[1] = tail + 1
+        return True
+
+    def drain(self) -> List[Tuple[int, int]]:
+        """Removes and returns all messages in the buffer"""
+        words = self.__words
+        head, tail = words[0], words[1]
+        messages = []
+        for i in range(head, tail):
+            slot = 2 + 2 * (i % self.capacity)
+            messages.append((words[slot], words[slot + 1]))
+        words[0] = tail
+        return messages
+
+
+@dataclass(frozen=True)
+class Machine:
+    "What a fleet needs to start a computer in a worker"
+
+    program: Tuple[int, ...]
+    stdin: Tuple[int, ...] = ()
+    engine: str = "fast"
+    tenant: str = "default"
+
+
+@dataclass(frozen=True)
+class MachineResult:
+    "Where a machine ended up"
+
+    state: State
+    stdout: Tuple[int, ...]
+    "Output not routed to another machine"
+
+    stdin: Tuple[int, ...]
+    "Input received but never read"
+
+    instructions: int
+    shard: int
+
+
+def place(machines: int, links: Dict[int, int], shards: int) -> List[int]:
+    """
+    Returns the shard of every machine
+
+    Machines linked to each other are grouped together, groups too large for
+    one shard are cut into runs of neighbours in link order, and groups are then
+    handed out to the least loaded shard, largest first.
+    """
+    neighbours: Dict[int, List[int]] = {m: [] for m in range(machines)}
+    for (source, destination) in links.items():
+        neighbours[source].append(destination)
+        neighbours[destination].append(source)
+
+    groups: List[List[int]] = []
+    seen = set()
+    for machine in range(machines):
+        if machine in seen:
+            continue
+        # Depth first so chains and rings come out in order
+        group, pending = [], [machine]
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            group.append(current)
+            pending.extend(reversed(neighbours[current]))
+        groups.append(group)
+
+    size = ceil(machines / shards) if machines else 1
+    pieces = [
+        group[i : i + size] for group in groups for i in range(0, len(group), size)
+    ]
+    load = [0] * shards
+    shard_of = [0] * machines
+    for piece in sorted(pieces, key=len, reverse=True):
+        shard = load.index(min(load))
+        load[shard] += len(piece)
+        for machine in piece:
+            shard_of[machine] = shard
+    return shard_of
+
+
+def _rings(
+    words: memoryview, shards: int, capacity: int
+) -> Dict[Tuple[int, int], RingBuffer]:
+    """Maps (from, to) shard pairs to their ring, laid out after the status"""
+    rings = {}
+    offset = STATUS * shards + 1
+    size = RingBuffer.words(capacity)
+    for source in range(shards):
+        for destination in range(shards):
+            if source != destination:
+                rings[source, destination] = RingBuffer(
+                    words[offset : offset + size], capacity
+                )
+                offset += size
+    return rings
+
+
+def _work(
+    shard: int,
+    shards: int,
+    machines: Dict[int, Machine],
+    links: Dict[int, int],
+    shard_of: List[int],
+    memory: SharedMemory,
+    capacity: int,
+    quantum: int,
+    results: Queue,
+) -> NoReturn:
+    """Runs the machines of one shard until the coordinator says stop"""
+    words = memory.buf.cast("q")
+    status = STATUS * shard
+    stop = STATUS * shards
+    rings = _rings(words, shards, capacity)
+    incoming = [rings[other, shard] for other in range(shards) if other != shard]
+
+    scheduler = Scheduler(quantum)
+    pids: Dict[int, int] = {}
+    computers: Dict[int, Computer] = {}
+    for (machine, spec) in machines.items():
+        computer = Computer(
+            list(spec.program), io=QueuedIO(spec.stdin), engine=spec.engine
+        )
+        pids[machine] = scheduler.spawn(computer, tenant=spec.tenant)
+        computers[machine] = computer
+
+    remote: Dict[int, int] = {}
+    "Machines on this shard sending to machines on other shards"
+    for (source, destination) in links.items():
+        if source not in machines:
+            continue
+        if shard_of[destination] == shard:
+            scheduler.connect(pids[source], pids[destination])
+        else:
+            remote[source] = destination
+
+    outbox: Deque[Tuple[int, int]] = deque()
+    sent = received = 0
+    try:
+        while not words[stop]:
+            for ring in incoming:
+                for (machine, value) in ring.drain():
+                    if pids[machine] in scheduler.tasks:
+                        scheduler.send(pids[machine], value)
+                    else:
+                        # Halted already, keep it as unread input
+                        computers[machine].io.stdin.append(value)
+                    received += 1
+            busy = scheduler.step()
+            for (source, destination) in remote.items():
+                stdout = computers[source].io.stdout
+                while stdout:
+                    outbox.append((destination, stdout.popleft()))
+            while outbox:
+                (destination, value) = outbox[0]
+                if not rings[shard, shard_of[destination]].put(destination, value):
+                    # Full, try again after running some more
+                    break
+                outbox.popleft()
+                sent += 1
+            words[status] = sent
+            words[status + 1] = received
+            words[status + 2] = not busy and not outbox
+            if not busy:
+                sleep(0.0001)
+        results.put(
+            {
+                machine: MachineResult(
+                    state=computer.state,
+                    stdout=tuple(computer.io.stdout),
+                    stdin=tuple(computer.io.stdin),
+                    instructions=computer.instructions,
+                    shard=shard,
+                )
+                for (machine, computer) in computers.items()
+            }
+        )
+    finally:
+        del words
+        rings.clear()
+        incoming.clear()
+
+
+class Fleet:
+    """
+    Machines partitioned over worker processes, see the module docs
+
+    Add machines with `add`, link output of one to input of another with
+    `connect` and `run` them all to completion.
+    """
+
+    shards: int
+    quantum: int
+    capacity: int
+    "Messages each ring buffer holds"
+
+    machines: List[Machine]
+    links: Dict[int, int]
+    "Destination machine of the output of each linked machine"
+
+    def __init__(
+        self,
+        shards: Optional[int] = None,
+        quantum: int = 10_000,
+        capacity: int = 4096,
+    ) -> NoReturn:
+        self.shards = shards or cpu_count()
+        self.quantum = quantum
+        self.capacity = capacity
+        self.machines = []
+        self.links = {}
+
+    def add(self, machine: Machine) -> int:
+        """Adds a machine, returns its id"""
+        self.machines.append(machine)
+        return len(self.machines) - 1
+
+    def connect(self, source: int, destination: int) -> NoReturn:
+        """Routes all output of machine `source` to the input of `destination`"""
+        self.links[source] = destination
+
+    def place(self) -> List[int]:
+        """Returns the shard every machine will run on"""
+        return place(len(self.machines), self.links, self.shards)
+
+    def run(self, poll: float = 0.001) -> Dict[int, MachineResult]:
+        """
+        Runs every machine until the fleet is done, see the module docs
+
+        Returns where each machine ended up, by id.
+        """
+        shard_of = self.place()
+        shards = self.shards
+        size = STATUS * shards + 1
+        size += shards * (shards - 1) * RingBuffer.words(self.capacity)
+        memory = SharedMemory(create=True, size=size * WORD)
+        words = memory.buf.cast("q")
+        results: Queue = Queue()
+        try:
+            for i in range(size):
+                words[i] = 0
+            workers = [
+                Process(
+                    target=_work,
+                    args=(
+                        shard,
+                        shards,
+                        {
+                            machine: spec
+                            for (machine, spec) in enumerate(self.machines)
+                            if shard_of[machine] == shard
+                        },
+                        self.links,
+                        shard_of,
+                        memory,
+                        self.capacity,
+                        self.quantum,
+                        results,
+                    ),
+                    daemon=True,
+                )
+                for shard in range(shards)
+            ]
+            for worker in workers:
+                worker.start()
+
+            previous = None
+            while True:
+                if any(worker.exitcode for worker in workers):
+                    raise ExecutionError("A fleet worker failed")
+                status = tuple(words[: STATUS * shards])
+                sent = sum(status[0::STATUS])
+                received = sum(status[1::STATUS])
+                idle = all(status[2::STATUS])
+                # Counts unchanged since last time, nothing can be in flight
+                if idle and sent == received and status == previous:
+                    break
+                previous = status
+                sleep(poll)
+
+            words[STATUS * shards] = 1
+            outcome: Dict[int, MachineResult] = {}
+            for _ in workers:
+                outcome.update(results.get())
+            for worker in workers:
+                worker.join()
+            return dict(sorted(outcome.items()))
+        finally:
+            words[STATUS * shards] = 1
+            del words
+            memory.close()
+            memory.unlink()
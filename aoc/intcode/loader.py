@@ -0,0 +1,111 @@
+"""
+Loading IntCode programs from text and binary images
+
+Puzzle input comes as comma separated text, `parse` turns it into ints with a
+single split rather than compiling it as a Python literal. For big programs,
+or many processes running the same one, images can be saved in a compact
+binary format: an 8 byte magic, the number of cells as a little endian int64
+and then every cell as a little endian int64. Loading one is a single buffer
+copy, and `map_image` maps it read only instead, so any number of processes
+share one copy of the image through the page cache.
+"""
+import mmap
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, List, NoReturn, Sequence, Union
+
+from aoc.intcode import ExecutionError
+
+MAGIC = b"INTCODE1"
+HEADER = len(MAGIC) + 8
+"Bytes before the first cell, the magic and the cell count"
+
+WORD = 8
+
+PathLike = Union[str, Path]
+
+
+def parse(text: str) -> List[int]:
+    """Returns the cells of a comma separated program, whitespace is ignored"""
+    text = text.strip()
+    if not text:
+        return []
+    try:
+        return list(map(int, text.split(",")))
+    except ValueError:
+        raise ExecutionError("Invalid program text, expected comma separated ints")
+
+
+def load_text(path: PathLike) -> List[int]:
+    with open(path) as f:
+        return parse(f.read())
+
+
+def dump_text(program: Iterable[int], path: PathLike) -> NoReturn:
+    with open(path, "w") as f:
+        f.write(",".join(map(str, program)) + "\n")
+
+
+def _little_endian(cells: array) -> array:
+    if sys.byteorder != "little":
+        cells.byteswap()
+    return cells
+
+
+def save_image(program: Iterable[int], path: PathLike) -> NoReturn:
+    """Writes `program` as a binary image, cells have to fit in 64 bits"""
+    try:
+        cells = _little_endian(array("q", program))
+    except OverflowError:
+        raise ExecutionError("Binary images only hold 64 bit values")
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(cells).to_bytes(8, "little", signed=True))
+        f.write(cells.tobytes())
+
+
+def _check(header: bytes, size: int) -> int:
+    """Returns the cell count of an image of `size` bytes starting `header`"""
+    if header[: len(MAGIC)] != MAGIC:
+        raise ExecutionError("Not an IntCode image")
+    length = int.from_bytes(header[len(MAGIC) : HEADER], "little", signed=True)
+    if length < 0 or HEADER + length * WORD > size:
+        raise ExecutionError("Truncated IntCode image")
+    return length
+
+
+def load_image(path: PathLike) -> array:
+    """Returns the cells of a binary image as an `array('q')`"""
+    with open(path, "rb") as f:
+        data = f.read()
+    length = _check(data[:HEADER], len(data))
+    cells = array("q")
+    cells.frombytes(data[HEADER : HEADER + length * WORD])
+    return _little_endian(cells)
+
+
+def map_image(path: PathLike) -> Sequence[int]:
+    """
+    Returns the cells of a binary image mapped read only into memory
+
+    Nothing is copied, pages are read in on first access and shared by every
+    process mapping the same file. Copy it into a writable memory to run it,
+    e.g. `ArrayMemory(map_image(path))`. Big endian machines can't use the
+    little endian cells in place and get them loaded like `load_image` does.
+    """
+    if sys.byteorder != "little":
+        return load_image(path)
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    length = _check(mapped[:HEADER], len(mapped))
+    return memoryview(mapped)[HEADER : HEADER + length * WORD].cast("q")
+
+
+def load(path: PathLike) -> List[int]:
+    """Returns the program at `path`, either a binary image or text"""
+    with open(path, "rb") as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    if binary:
+        return load_image(path).tolist()
+    return load_text(path)
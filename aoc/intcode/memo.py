@@ -0,0 +1,157 @@
+"""
+Memoized IntCode runs
+
+IntCode programs are deterministic, the outcome of a run only depends on the
+initial memory, the instruction pointer and the input. `ResultCache` keys runs
+on a content hash of those and hands back the stored outcome on repeats, from
+an LRU in memory and optionally from an sqlite file shared between processes.
+"""
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, NoReturn, Optional, Tuple, Union
+
+from aoc.intcode import Computer, ExecutionError, QueuedIO, State
+
+
+@dataclass(frozen=True)
+class RunResult:
+    "Outcome of running a program"
+
+    memory: Tuple[int, ...]
+    pos: int
+    state: State
+    stdout: Tuple[int, ...]
+    consumed: int
+    "Number of input values read"
+
+
+def run_key(memory: Iterable[int], stdin: Iterable[int], pos: int = 0) -> str:
+    """Returns the content hash identifying a run"""
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, memory)).encode())
+    digest.update(b"|")
+    digest.update(",".join(map(str, stdin)).encode())
+    digest.update(f"|{pos}".encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of run results with an optional on disk backend
+
+    Results missing from memory are looked up in the sqlite database at `path`
+    (when given) before running, and every new result is written through to it.
+    """
+
+    maxsize: int
+    path: Optional[Path]
+
+    hits: int
+    misses: int
+
+    def __init__(
+        self, maxsize: int = 128, path: Optional[Union[str, Path]] = None
+    ) -> NoReturn:
+        self.maxsize = maxsize
+        self.path = None if path is None else Path(path)
+        self.hits = 0
+        self.misses = 0
+        self.__results: OrderedDict = OrderedDict()
+        self.__db = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.__db = sqlite3.connect(str(self.path))
+            self.__db.execute(
+                "CREATE TABLE IF NOT EXISTS results"
+                " (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def __len__(self) -> int:
+        return len(self.__results)
+
+    def __remember(self, key: str, result: RunResult) -> NoReturn:
+        self.__results[key] = result
+        self.__results.move_to_end(key)
+        if len(self.__results) > self.maxsize:
+            self.__results.popitem(last=False)
+
+    def get(self, key: str) -> Optional[RunResult]:
+        """Returns the stored result for `key`, counting hits and misses"""
+        if (result := self.__results.get(key)) is not None:
+            self.__results.move_to_end(key)
+        elif self.__db is not None:
+            row = self.__db.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                stored = json.loads(row[0])
+                result = RunResult(
+                    memory=tuple(stored["memory"]),
+                    pos=stored["pos"],
+                    state=State(stored["state"]),
+                    stdout=tuple(stored["stdout"]),
+                    consumed=stored["consumed"],
+                )
+                self.__remember(key, result)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: RunResult) -> NoReturn:
+        self.__remember(key, result)
+        if self.__db is not None:
+            with self.__db:
+                self.__db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?)",
+                    (key, json.dumps(asdict(result))),
+                )
+
+    def run(self, computer: Computer) -> bool:
+        """
+        Runs `computer` like `Computer.run_program`, unless the same run has
+        been seen before in which case its outcome is applied directly
+
+        Only computers using a `QueuedIO` can be memoized, as their input is
+        known up front.
+        """
+        if not isinstance(computer.io, QueuedIO):
+            raise ExecutionError("Only runs with queued IO can be memoized")
+        io = computer.io
+        stdin = tuple(io.stdin)
+        key = run_key(computer.memory, stdin, computer.pos)
+        if (result := self.get(key)) is None:
+            written = len(io.stdout)
+            computer.run_program()
+            result = RunResult(
+                memory=tuple(computer.memory),
+                pos=computer.pos,
+                state=computer.state,
+                stdout=tuple(io.stdout)[written:],
+                consumed=len(stdin) - len(io.stdin),
+            )
+            self.put(key, result)
+        else:
+            if isinstance(computer.memory, list):
+                computer.memory[:] = result.memory
+            else:
+                computer.memory = list(result.memory)
+            computer.cache.clear()
+            computer.pos = result.pos
+            computer.state = result.state
+            io.stdout.extend(result.stdout)
+            for _ in range(result.consumed):
+                io.stdin.popleft()
+        return result.state == State.HALTED
+
+    def clear(self) -> NoReturn:
+        """Forgets all results, including the ones on disk"""
+        self.__results.clear()
+        if self.__db is not None:
+            with self.__db:
+                self.__db.execute("DELETE FROM results")
@@ -0,0 +1,210 @@
+"""
+Memory implementations for the IntCode computer
+
+Anything behaving like a fixed size `MutableSequence` of ints can serve as RAM,
+a plain list is the default. The backends here trade some access speed for
+cheaper copies (`PagedMemory`), a smaller footprint (`ArrayMemory`) or room
+beyond the program image (`SparseMemory`). All of them can be forked.
+"""
+from abc import abstractmethod
+from array import array
+from collections.abc import MutableSequence
+from typing import Dict, Iterable, List, NoReturn, Union
+
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+"Number of words per page, 256"
+
+
+class Memory(MutableSequence):
+    "Base for memory backends, which can't change size by insert or delete"
+
+    @abstractmethod
+    def fork(self) -> "Memory":
+        """Returns an independent copy"""
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, Memory)):
+            return len(self) == len(other) and all(
+                a == b for (a, b) in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)})"
+
+    def __delitem__(self, index) -> NoReturn:
+        raise TypeError("Memory has a fixed size")
+
+    def insert(self, index: int, value: int) -> NoReturn:
+        raise TypeError("Memory has a fixed size")
+
+
+class PagedMemory(Memory):
+    """
+    Copy on write memory split into pages of `PAGE_SIZE` words
+
+    Forking only copies the list of pages, both sides then share every page
+    until one of them writes to it. Forks of forks work the same way, so any
+    number of machines can hold on to one common memory image.
+    """
+
+    pages: List[List[int]]
+
+    shared: List[bool]
+    "Pages possibly referenced by another fork, copied before writing"
+
+    length: int
+
+    def __init__(self, data: Iterable[int] = ()) -> NoReturn:
+        data = list(data)
+        self.pages = [data[i : i + PAGE_SIZE] for i in range(0, len(data), PAGE_SIZE)]
+        self.shared = [False] * len(self.pages)
+        self.length = len(data)
+
+    def fork(self) -> "PagedMemory":
+        """Returns a copy sharing all pages with this memory"""
+        other = PagedMemory.__new__(PagedMemory)
+        other.pages = list(self.pages)
+        other.length = self.length
+        self.shared = [True] * len(self.pages)
+        other.shared = [True] * len(self.pages)
+        return other
+
+    def __index(self, index: int) -> int:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("memory index out of range")
+        return index
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        index = self.__index(index)
+        return self.pages[index >> PAGE_BITS][index & (PAGE_SIZE - 1)]
+
+    def __setitem__(self, index: int, value: int) -> NoReturn:
+        index = self.__index(index)
+        page = index >> PAGE_BITS
+        if self.shared[page]:
+            self.pages[page] = self.pages[page].copy()
+            self.shared[page] = False
+        self.pages[page][index & (PAGE_SIZE - 1)] = value
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from page
+
+
+class ArrayMemory(Memory):
+    """
+    Compact memory storing one signed 64 bit machine word per cell
+
+    Backed by an `array('q')`, a fraction of the size of a list of boxed ints,
+    and forked with a single buffer copy. The first value not fitting in 64 bits
+    switches it over to a plain list of Python ints.
+    """
+
+    data: Union[array, List[int]]
+
+    def __init__(self, data: Iterable[int] = ()) -> NoReturn:
+        if (isinstance(data, array) and data.typecode == "q") or (
+            isinstance(data, memoryview) and data.format == "q"
+        ):
+            # Already 64 bit words, such as a mapped image, copy the buffer
+            self.data = array("q")
+            self.data.frombytes(memoryview(data).cast("B"))
+            return
+        data = list(data)
+        try:
+            self.data = array("q", data)
+        except OverflowError:
+            self.data = data
+
+    @property
+    def promoted(self) -> bool:
+        "True once values outgrew 64 bits"
+        return isinstance(self.data, list)
+
+    def fork(self) -> "ArrayMemory":
+        other = ArrayMemory.__new__(ArrayMemory)
+        other.data = self.data.copy() if self.promoted else self.data.__copy__()
+        return other
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return list(self.data[index])
+        return self.data[index]
+
+    def __setitem__(self, index: int, value: int) -> NoReturn:
+        try:
+            self.data[index] = value
+        except OverflowError:
+            self.data = list(self.data)
+            self.data[index] = value
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+
+class SparseMemory(Memory):
+    """
+    Memory without an upper bound, the program image plus an overlay dict
+
+    Cells past the end of `base` read as 0 until written, and only the written
+    ones take up any space. Negative addresses are still out of bounds.
+    """
+
+    base: MutableSequence
+    "The program image"
+
+    extra: Dict[int, int]
+    "Cells written beyond `base`"
+
+    length: int
+    "One past the highest cell written so far"
+
+    def __init__(self, base: Iterable[int] = ()) -> NoReturn:
+        self.base = base if isinstance(base, MutableSequence) else list(base)
+        self.extra = {}
+        self.length = len(self.base)
+
+    def fork(self) -> "SparseMemory":
+        other = SparseMemory.__new__(SparseMemory)
+        base = self.base
+        other.base = base.fork() if isinstance(base, Memory) else list(base)
+        other.extra = dict(self.extra)
+        other.length = self.length
+        return other
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(max(self.length, index.stop or 0))
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            raise IndexError("memory index out of range")
+        if index < len(self.base):
+            return self.base[index]
+        return self.extra.get(index, 0)
+
+    def __setitem__(self, index: int, value: int) -> NoReturn:
+        if index < 0:
+            raise IndexError("memory index out of range")
+        if index < len(self.base):
+            self.base[index] = value
+        else:
+            self.extra[index] = value
+            self.length = max(self.length, index + 1)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self):
+        return (self[i] for i in range(self.length))
@@ -0,0 +1,128 @@
+"""
+Parallel parameter searches over IntCode programs
+
+`sweep` runs one program under many memory patches (such as the noun and verb
+of day 2) across a process pool. Every worker receives the program once, when
+it's started, and then only gets chunks of patches to try. Matches come back a
+chunk at a time and all workers stop as soon as one is found.
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from multiprocessing import Event
+from os import cpu_count
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+)
+
+from aoc.intcode import Computer, ExecutionError, QueuedIO, restore_program
+
+Patch = Dict[int, int]
+"Memory updates to apply before a run, see `restore_program`"
+
+Predicate = Callable[[Computer], bool]
+"Decides whether a finished computer is a match, must be picklable"
+
+# Per worker state, set up once by `_init_worker`
+_program: Tuple[int, ...] = ()
+_predicate: Optional[Predicate] = None
+_stdin: Tuple[int, ...] = ()
+_engine: str = "fast"
+_found = None
+
+
+def _init_worker(program, predicate, stdin, engine, found) -> NoReturn:
+    global _program, _predicate, _stdin, _engine, _found
+    _program, _predicate, _stdin, _engine, _found = (
+        program,
+        predicate,
+        stdin,
+        engine,
+        found,
+    )
+
+
+def _try(patch: Patch) -> bool:
+    memory = restore_program(patch, list(_program))
+    c = Computer(memory, io=QueuedIO(_stdin), engine=_engine)
+    try:
+        c.run_program()
+    except (ExecutionError, IndexError, ValueError):
+        # Out of range candidates are expected, they just don't match
+        return False
+    return _predicate(c)
+
+
+def _run_chunk(chunk: List[Patch]) -> List[Patch]:
+    """Returns the patches in `chunk` which match, stops early once found"""
+    matches = []
+    for patch in chunk:
+        if _found.is_set():
+            break
+        if _try(patch):
+            matches.append(patch)
+            _found.set()
+    return matches
+
+
+def _chunks(patches: Iterable[Patch], size: int) -> Iterator[List[Patch]]:
+    patches = iter(patches)
+    while chunk := list(islice(patches, size)):
+        yield chunk
+
+
+def sweep(
+    program: Iterable[int],
+    patches: Iterable[Patch],
+    predicate: Predicate,
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+    stdin: Iterable[int] = (),
+    engine: str = "fast",
+) -> Optional[Patch]:
+    """
+    Returns a patch for which `predicate` holds after running `program`
+
+    Patches are consumed lazily, only a couple of chunks per worker are in
+    flight at any time. When several patches match, whichever is found first
+    is returned, which isn't necessarily the first one in order.
+
+    Args:
+        program: The memory image to run
+        patches: Memory updates to try, one run each
+        predicate: Tells matches apart, a module level function so it can be
+                   sent to the workers
+        workers: Number of processes, defaults to the number of CPUs
+        chunksize: Number of patches sent to a worker at once
+        stdin: Input given to every run
+        engine: Execution engine used by the workers
+    """
+    workers = workers or cpu_count()
+    found = Event()
+    chunks = _chunks(patches, chunksize)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(tuple(program), predicate, tuple(stdin), engine, found),
+    ) as pool:
+        pending = {
+            pool.submit(_run_chunk, chunk)
+            for chunk in islice(chunks, 2 * workers)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if matches := future.result():
+                    for future in pending:
+                        future.cancel()
+                    return matches[0]
+            pending |= {
+                pool.submit(_run_chunk, chunk) for chunk in islice(chunks, len(done))
+            }
+    return None
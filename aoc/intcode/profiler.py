@@ -0,0 +1,128 @@
+"""
+Instruction level profiling of IntCode programs
+
+Attach a `Profiler` to a `Computer` and every executed instruction is counted
+by address and by OpCode, conditional jumps record whether they were taken and
+time spent on IO (including time suspended waiting for input) is measured.
+"""
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, List, NoReturn, Optional, Sequence
+
+from aoc.intcode import OpCode
+from aoc.intcode.disasm import format_instruction
+
+BRANCHES = (OpCode.JMPT, OpCode.JMPF)
+
+
+@dataclass
+class Profiler:
+    "Execution counts and IO timings collected while running a computer"
+
+    addresses: Counter = field(default_factory=Counter)
+    "Number of executions per instruction address"
+
+    ops: Counter = field(default_factory=Counter)
+    "Number of executions per `OpCode`"
+
+    branches: Dict[int, List[int]] = field(default_factory=dict)
+    "Taken and not taken counts per conditional jump address"
+
+    io_wait: float = 0.0
+    "Seconds spent in IO instructions and suspended waiting for input"
+
+    suspended_at: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def instructions(self) -> int:
+        return sum(self.ops.values())
+
+    def record(self, pos: int, op: OpCode, next_pos: int) -> NoReturn:
+        """Counts one execution of `op` at `pos`, which continued at `next_pos`"""
+        self.addresses[pos] += 1
+        self.ops[op] += 1
+        if op in BRANCHES:
+            counts = self.branches.setdefault(pos, [0, 0])
+            counts[next_pos == pos + 3] += 1
+
+    def suspend(self) -> NoReturn:
+        """Marks the computer as blocked on input"""
+        self.suspended_at = perf_counter()
+
+    def resume(self) -> NoReturn:
+        """Accounts for the time blocked on input, if any"""
+        if self.suspended_at is not None:
+            self.io_wait += perf_counter() - self.suspended_at
+            self.suspended_at = None
+
+    def reset(self) -> NoReturn:
+        self.addresses.clear()
+        self.ops.clear()
+        self.branches.clear()
+        self.io_wait = 0.0
+        self.suspended_at = None
+
+    def to_dict(self, memory: Sequence[int], top: int = 10) -> dict:
+        """
+        Returns the report as plain data, see `report`
+
+        Args:
+            memory: Memory to disassemble the hot addresses from
+            top: Number of hot addresses to include
+        """
+        total = self.instructions or 1
+        hot = []
+        for (pos, count) in self.addresses.most_common(top):
+            entry = {
+                "address": pos,
+                "count": count,
+                "share": count / total,
+                "instruction": format_instruction(memory, pos),
+            }
+            if pos in self.branches:
+                taken, not_taken = self.branches[pos]
+                entry["taken"] = taken
+                entry["not_taken"] = not_taken
+            hot.append(entry)
+        return {
+            "instructions": self.instructions,
+            "io_wait": self.io_wait,
+            "hot": hot,
+            "ops": {
+                op.name: count
+                for (op, count) in sorted(self.ops.items(), key=lambda i: -i[1])
+            },
+        }
+
+    def to_json(self, memory: Sequence[int], top: int = 10, **kwargs) -> str:
+        return json.dumps(self.to_dict(memory, top), **kwargs)
+
+    def report(self, memory: Sequence[int], top: int = 10) -> str:
+        """
+        Returns a text report of the `top` hottest addresses (disassembled from
+        `memory`) and a histogram of executed OpCodes
+        """
+        data = self.to_dict(memory, top)
+        total = data["instructions"] or 1
+        lines = [
+            f"{data['instructions']} instructions, "
+            f"{data['io_wait']:.6f}s waiting on IO",
+            "",
+            f"{'address':>8} {'count':>10} {'share':>7}  instruction",
+        ]
+        for entry in data["hot"]:
+            line = (
+                f"{entry['address']:>8} {entry['count']:>10} "
+                f"{entry['share']:>7.1%}  {entry['instruction']}"
+            )
+            if "taken" in entry:
+                ratio = entry["taken"] / (entry["taken"] + entry["not_taken"])
+                line += f"  ({ratio:.0%} taken)"
+            lines.append(line)
+        lines += ["", f"{'opcode':>8} {'count':>10} {'share':>7}"]
+        for (name, count) in data["ops"].items():
+            bar = "#" * round(40 * count / total)
+            lines.append(f"{name:>8} {count:>10} {count / total:>7.1%}  {bar}")
+        return "\n".join(lines)
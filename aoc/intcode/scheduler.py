@@ -0,0 +1,185 @@
+"""
+Time sliced scheduling of many IntCode computers in one thread
+
+A `Scheduler` owns any number of computers and runs them round robin, each for
+at most `quantum` instructions at a time. Machines blocked on input are parked
+until a message arrives for them, either sent from the outside with `send` or
+written by another machine whose output has been `connect`ed to them, and
+machines which halt are retired. Higher priority classes always run first,
+machines in the same class share the processor evenly.
+
+Instructions executed and wall time spent are accounted per tenant.
+"""
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from time import perf_counter
+from typing import Deque, Dict, List, NoReturn, Optional
+
+from aoc.intcode import Computer, ExecutionError, QueuedIO, State
+
+
+class Priority(IntEnum):
+    "Priority class of a task, lower values run first"
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+@dataclass
+class Task:
+    "A computer managed by a `Scheduler`"
+
+    pid: int
+    computer: Computer
+    tenant: str = "default"
+    priority: Priority = Priority.NORMAL
+
+    route: Optional[int] = None
+    "Task receiving the output of this one, see `Scheduler.connect`"
+
+    @property
+    def state(self) -> State:
+        return self.computer.state
+
+
+@dataclass
+class Account:
+    "Resources used by one tenant"
+
+    instructions: int = 0
+    wall_time: float = 0.0
+    "Seconds spent running the tenant's machines"
+
+    slices: int = 0
+    "Number of times any of the tenant's machines got to run"
+
+
+class Scheduler:
+    """
+    Round robin scheduler with priority classes
+
+    Machines need a `QueuedIO`, so input can be delivered to them and their
+    output collected.
+    """
+
+    quantum: int
+    "Instructions a machine runs before the next one gets its turn"
+
+    tasks: Dict[int, Task]
+    "Every task not yet halted, by pid"
+
+    finished: Dict[int, Task]
+    "Halted tasks, by pid"
+
+    failed: Dict[int, Task]
+    "Tasks whose machine raised an error, by pid"
+
+    accounts: Dict[str, Account]
+
+    def __init__(self, quantum: int = 10_000) -> NoReturn:
+        self.quantum = quantum
+        self.tasks = {}
+        self.finished = {}
+        self.failed = {}
+        self.accounts = {}
+        self.__ready: Dict[Priority, Deque[int]] = {p: deque() for p in Priority}
+        self.__parked: Dict[int, Task] = {}
+        self.__next_pid = 0
+
+    def spawn(
+        self,
+        computer: Computer,
+        tenant: str = "default",
+        priority: Priority = Priority.NORMAL,
+    ) -> int:
+        """Adds `computer` to the scheduler, returns its pid"""
+        if not isinstance(computer.io, QueuedIO):
+            raise ExecutionError("Scheduled computers need a QueuedIO")
+        pid = self.__next_pid
+        self.__next_pid += 1
+        task = self.tasks[pid] = Task(pid, computer, tenant, priority)
+        self.accounts.setdefault(tenant, Account())
+        if computer.state == State.HALTED:
+            self.__retire(task)
+        else:
+            self.__ready[priority].append(pid)
+        return pid
+
+    def send(self, pid: int, *values: int) -> NoReturn:
+        """Delivers input to task `pid`, waking it if it's parked"""
+        task = self.tasks[pid]
+        task.computer.io.stdin.extend(values)
+        if values and self.__parked.pop(pid, None) is not None:
+            self.__ready[task.priority].append(pid)
+
+    def connect(self, source: int, destination: int) -> NoReturn:
+        """Sends all output of task `source` on to task `destination`"""
+        self.tasks[source].route = destination
+
+    def parked(self) -> List[int]:
+        """Returns the pids of tasks blocked waiting for input"""
+        return list(self.__parked)
+
+    def __retire(self, task: Task) -> NoReturn:
+        del self.tasks[task.pid]
+        self.finished[task.pid] = task
+
+    def __deliver(self, task: Task) -> NoReturn:
+        """Moves output of `task` over to the task it's connected to"""
+        stdout = task.computer.io.stdout
+        if task.route is None or not stdout:
+            return
+        if task.route in self.tasks:
+            values = list(stdout)
+            stdout.clear()
+            self.send(task.route, *values)
+
+    def step(self) -> bool:
+        """
+        Runs the next ready task for one quantum
+
+        Returns false if there was nothing to run, every task has either
+        halted or is parked. A task whose machine raises is moved to `failed`
+        before the error is passed on.
+        """
+        queue = next((q for q in self.__ready.values() if q), None)
+        if queue is None:
+            return False
+        task = self.tasks[queue.popleft()]
+        computer = task.computer
+        account = self.accounts[task.tenant]
+
+        executed = computer.instructions
+        start = perf_counter()
+        try:
+            state = computer.run_for(self.quantum)
+        except Exception:
+            del self.tasks[task.pid]
+            self.failed[task.pid] = task
+            raise
+        finally:
+            account.wall_time += perf_counter() - start
+            account.instructions += computer.instructions - executed
+            account.slices += 1
+
+        self.__deliver(task)
+        if state == State.HALTED:
+            self.__retire(task)
+        elif state == State.WAITING and not computer.io.stdin:
+            self.__parked[task.pid] = task
+        else:
+            queue.append(task.pid)
+        return True
+
+    def run(self) -> bool:
+        """
+        Runs until no task is ready
+
+        Returns true if all tasks halted, false if some are parked waiting for
+        input which will never come unless sent from the outside.
+        """
+        while self.step():
+            pass
+        return not self.tasks and not self.failed
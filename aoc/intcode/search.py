@@ -0,0 +1,197 @@
+"""
+Search over orders of phase settings for chains of IntCode machines
+
+Chains like day 7's amplifiers start one machine per phase setting and pass a
+signal from each machine to the next. What comes out of the first k machines
+only depends on the first k phases, so rather than running every order from
+scratch `PhaseSearch` walks the tree of orders depth first and runs one machine
+per node, that is per distinct prefix: 325 instead of 5 * 120 for five phases.
+Outputs are memoized by prefix and input signal, so later searches and single
+chains reuse them too.
+
+In a feedback loop the machines keep running after their first signal, so
+instead of outputs each node keeps its machines, suspended waiting for input.
+Every order below it copies them before closing the loop.
+"""
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NoReturn,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from aoc.intcode import Computer, ExecutionError, QueuedIO, State
+
+Order = Tuple[int, ...]
+
+
+def amplify(machine: Computer, signals: Iterable[int]) -> List[int]:
+    """Feeds `signals` to `machine`, returns what it outputs before waiting"""
+    io = machine.io
+    io.stdin.extend(signals)
+    machine.run_until_input()
+    output = list(io.stdout)
+    io.stdout.clear()
+    return output
+
+
+def branch(machine: Computer) -> Computer:
+    """
+    Returns a copy of `machine`, suspended in the same state
+
+    A plain copy of memory and queues, which for machines this size is a lot
+    cheaper than `Computer.fork` deep copying IO.
+    """
+    io = QueuedIO(machine.io.stdin)
+    io.stdout.extend(machine.io.stdout)
+    other = Computer(
+        machine.memory[:], io=io, engine=machine.engine, program=machine.program
+    )
+    other.pos = machine.pos
+    other.state = machine.state
+    other.instructions = machine.instructions
+    return other
+
+
+def close_loop(machines: Sequence[Computer], signals: List[int]) -> int:
+    """
+    Feeds the output of the last machine back into the first until the last
+    halts, returns the last signal out of it
+
+    Args:
+        machines: The chain, each having had its first round
+        signals: What came out of the last machine in that round
+    """
+    last = signals[-1] if signals else None
+    while machines[-1].state != State.HALTED:
+        if not signals:
+            raise ExecutionError("Machines are waiting on each other")
+        for machine in machines:
+            signals = amplify(machine, signals)
+        if signals:
+            last = signals[-1]
+    if last is None:
+        raise ExecutionError("Machines gave no signal")
+    return last
+
+
+class PhaseSearch:
+    """
+    Finds the order of phases giving the highest signal, see the module docs
+
+    `start` returns a new machine given its phase setting, with a `QueuedIO`
+    holding the phase.
+    """
+
+    memo: Dict[Tuple[Order, int], int]
+    "Signal out of a chain by its phases and input signal, in series"
+
+    runs: int
+    "Number of machines started"
+
+    forks: int
+    "Number of machines copied, for feedback loops"
+
+    def __init__(self, start: Callable[[int], Computer]) -> NoReturn:
+        self.start = start
+        self.memo = {}
+        self.runs = 0
+        self.forks = 0
+
+    def __step(self, phase: int, signals: List[int]) -> Tuple[Computer, List[int]]:
+        """Starts a machine for `phase`, returns it and its first output"""
+        self.runs += 1
+        machine = self.start(phase)
+        return machine, amplify(machine, signals)
+
+    def __next(self, prefix: Order, phase: int, signal: int, out: int) -> int:
+        """Returns the signal out of `prefix` and `phase`, `prefix` giving `out`"""
+        key = (prefix + (phase,), signal)
+        if key not in self.memo:
+            (_, output) = self.__step(phase, [out])
+            if not output:
+                raise ExecutionError(f"Machine {len(prefix)} gave no signal")
+            self.memo[key] = output[-1]
+        return self.memo[key]
+
+    def chain(self, phases: Sequence[int], signal: int = 0) -> int:
+        """Returns the signal out of the last machine of a series chain"""
+        prefix: Order = ()
+        out = signal
+        for phase in phases:
+            out = self.__next(prefix, phase, signal, out)
+            prefix += (phase,)
+        return out
+
+    def loop(self, phases: Sequence[int], signal: int = 0) -> int:
+        """Returns the last signal out of a feedback loop, see `close_loop`"""
+        machines = []
+        signals = [signal]
+        for phase in phases:
+            (machine, signals) = self.__step(phase, signals)
+            machines.append(machine)
+        return close_loop(machines, signals)
+
+    def series(
+        self, phases: Sequence[int], width: Optional[int] = None, signal: int = 0
+    ) -> Tuple[int, Order]:
+        """
+        Returns the highest signal out of a series chain of `width` machines
+        (all phases by default), each with a different one of `phases`, and the
+        order giving it
+        """
+        phases = tuple(phases)
+        width = len(phases) if width is None else width
+        best: Optional[Tuple[int, Order]] = None
+
+        def visit(prefix: Order, used: Tuple[int, ...], out: int) -> NoReturn:
+            nonlocal best
+            if len(prefix) == width:
+                best = (out, prefix) if best is None else max(best, (out, prefix))
+                return
+            for (i, phase) in enumerate(phases):
+                if i not in used:
+                    following = self.__next(prefix, phase, signal, out)
+                    visit(prefix + (phase,), used + (i,), following)
+
+        visit((), (), signal)
+        if best is None:
+            raise ExecutionError("Not enough phases for the chain")
+        return best
+
+    def feedback(
+        self, phases: Sequence[int], width: Optional[int] = None, signal: int = 0
+    ) -> Tuple[int, Order]:
+        """As `series`, for feedback loops, see `loop`"""
+        phases = tuple(phases)
+        width = len(phases) if width is None else width
+        best: Optional[Tuple[int, Order]] = None
+
+        def visit(
+            prefix: Order,
+            used: Tuple[int, ...],
+            machines: List[Computer],
+            signals: List[int],
+        ) -> NoReturn:
+            nonlocal best
+            if len(prefix) == width:
+                # The last machine is this order's own, the rest are shared
+                self.forks += len(machines) - 1
+                chain = [branch(machine) for machine in machines[:-1]]
+                out = close_loop(chain + machines[-1:], signals)
+                best = (out, prefix) if best is None else max(best, (out, prefix))
+                return
+            for (i, phase) in enumerate(phases):
+                if i not in used:
+                    (machine, output) = self.__step(phase, signals)
+                    chain = machines + [machine]
+                    visit(prefix + (phase,), used + (i,), chain, output)
+
+        visit((), (), [], [signal])
+        if best is None:
+            raise ExecutionError("Not enough phases for the chain")
+        return best
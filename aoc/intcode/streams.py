@@ -0,0 +1,218 @@
+"""
+Streaming IO for IntCode programs reading or writing millions of values
+
+A `Source` pulls input lazily, `read_ahead` values at a time, from a generator
+(`GeneratorSource`), a file descriptor of packed little endian int64s
+(`FileSource`) or a memory mapped file of them (`MappedSource`). A `Sink`
+collects at most `capacity` values of output before handing them to its
+consumer, which blocks the computer until it's done with them. That's the
+backpressure: a slow consumer, like a full pipe behind a `FileSink`, holds up
+the machine rather than letting output pile up. `StreamIO` plugs a source and a
+sink into a computer, which then runs in constant memory however much it reads
+and writes.
+
+A source with nothing to give right now raises `AwaitingInput`, the computer
+suspends and can be resumed once there's more.
+"""
+import mmap
+import os
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, List, NoReturn, Sequence, Union
+
+from aoc.intcode import AwaitingInput, ExecutionError, StdIO
+
+WORD = 8
+
+FileLike = Union[int, BinaryIO]
+
+
+def _fileno(file: FileLike) -> int:
+    return file if isinstance(file, int) else file.fileno()
+
+
+def _unpack(data: bytes) -> array:
+    values = array("q")
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class Source(ABC):
+    "Input read ahead `read_ahead` values at a time, see the module docs"
+
+    read_ahead: int
+
+    def __init__(self, read_ahead: int = 4096) -> NoReturn:
+        self.read_ahead = read_ahead
+        self.__chunk: Sequence[int] = ()
+        self.__cursor = 0
+
+    @abstractmethod
+    def fill(self, n: int) -> Sequence[int]:
+        """Returns up to `n` more values, none if there aren't any (yet)"""
+
+    def read(self) -> int:
+        if self.__cursor >= len(self.__chunk):
+            self.__chunk = self.fill(self.read_ahead)
+            self.__cursor = 0
+            if not self.__chunk:
+                raise AwaitingInput("Source is exhausted")
+        value = self.__chunk[self.__cursor]
+        self.__cursor += 1
+        return value
+
+
+class GeneratorSource(Source):
+    "Input taken from any iterable, including endless generators"
+
+    def __init__(self, values: Iterable[int], read_ahead: int = 4096) -> NoReturn:
+        super().__init__(read_ahead)
+        self.__values = iter(values)
+
+    def fill(self, n: int) -> List[int]:
+        return list(islice(self.__values, n))
+
+
+class FileSource(Source):
+    """
+    Input read from a file descriptor (or binary file) of packed int64s
+
+    The end of the file, or nothing to read on a non blocking descriptor,
+    suspends the computer. Words split over two reads are put back together.
+    """
+
+    def __init__(self, file: FileLike, read_ahead: int = 4096) -> NoReturn:
+        super().__init__(read_ahead)
+        self.fd = _fileno(file)
+        self.__partial = b""
+
+    def fill(self, n: int) -> array:
+        try:
+            data = os.read(self.fd, n * WORD - len(self.__partial))
+        except BlockingIOError:
+            data = b""
+        data = self.__partial + data
+        whole = len(data) - len(data) % WORD
+        self.__partial = data[whole:]
+        return _unpack(data[:whole])
+
+
+class MappedSource(Source):
+    """
+    Input read in place from a memory mapped file of packed int64s
+
+    Only the pages read so far are in memory, and they're shared with every
+    other process mapping the file.
+    """
+
+    def __init__(self, path: Union[str, Path], read_ahead: int = 4096) -> NoReturn:
+        super().__init__(read_ahead)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size % WORD:
+                raise ExecutionError("Mapped input has to be whole int64s")
+            if size == 0:
+                self.__words: Sequence[int] = ()
+            else:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.__words = memoryview(mapped).cast("q")
+        if sys.byteorder != "little" and self.__words:
+            # Would have to be swapped, which means copying
+            self.__words = _unpack(self.__words.tobytes())
+        self.__offset = 0
+
+    def fill(self, n: int) -> Sequence[int]:
+        start = self.__offset
+        self.__offset = min(start + n, len(self.__words))
+        return self.__words[start : self.__offset]
+
+
+class Sink:
+    """
+    Output handed to `consumer` `capacity` values at a time
+
+    The consumer is called synchronously, the computer waits for it. Call
+    `flush` (or use the `StreamIO` as a context manager) to hand over the
+    last, partial batch.
+    """
+
+    capacity: int
+
+    def __init__(
+        self, consumer: Callable[[List[int]], object], capacity: int = 4096
+    ) -> NoReturn:
+        self.consumer = consumer
+        self.capacity = capacity
+        self.__buffer: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.__buffer)
+
+    def write(self, value: int) -> NoReturn:
+        self.__buffer.append(value)
+        if len(self.__buffer) >= self.capacity:
+            self.flush()
+
+    def flush(self) -> NoReturn:
+        if self.__buffer:
+            batch, self.__buffer = self.__buffer, []
+            self.consumer(batch)
+
+
+class FileSink(Sink):
+    "Output written to a file descriptor (or binary file) as packed int64s"
+
+    def __init__(self, file: FileLike, capacity: int = 4096) -> NoReturn:
+        super().__init__(self.__write, capacity)
+        self.fd = _fileno(file)
+
+    def __write(self, batch: List[int]) -> NoReturn:
+        try:
+            values = array("q", batch)
+        except OverflowError:
+            raise ExecutionError("Only 64 bit values can be written packed")
+        if sys.byteorder != "little":
+            values.byteswap()
+        data = memoryview(values.tobytes())
+        while data:
+            # Blocks while the reader is behind
+            data = data[os.write(self.fd, data) :]
+
+
+class StreamIO(StdIO):
+    """
+    IO device reading from a `Source` and writing to a `Sink`
+
+    Without a source the computer suspends on input, without a sink output is
+    printed like `StdIO` does.
+    """
+
+    def __init__(self, source: Source = None, sink: Sink = None) -> NoReturn:
+        self.source = source
+        self.sink = sink
+
+    def read(self) -> int:
+        if self.source is None:
+            raise AwaitingInput("No input source")
+        return self.source.read()
+
+    def write(self, data: int) -> NoReturn:
+        if self.sink is None:
+            super().write(data)
+        else:
+            self.sink.write(data)
+
+    def flush(self) -> NoReturn:
+        if self.sink is not None:
+            self.sink.flush()
+
+    def __enter__(self) -> "StreamIO":
+        return self
+
+    def __exit__(self, *exc_info) -> NoReturn:
+        self.flush()
@@ -0,0 +1,281 @@
+"""
+Symbolic execution of branch free IntCode programs
+
+Searches like day 2's noun and verb patch a few cells of a program and look for
+values making it leave a target in memory. When the program only adds and
+multiplies, `execute` can run it once with the patched cells as symbols,
+leaving a `Polynomial` in every cell the symbols flow into, and `invert` then
+solves that polynomial for the target instead of running the program for
+every candidate: linear polynomials are solved outright, others by evaluating
+them, which is still far cheaper than running the program.
+
+Reading through a symbolic address gives an unknown value, which is fine as
+long as it's overwritten before it matters. Anything the polynomial can't
+describe, branches, IO, unknown values or symbols reaching an OpCode, a write
+address or the output, raises `NotSymbolic`. `find` then falls back to a
+parallel brute force `sweep`.
+"""
+from dataclasses import dataclass
+from itertools import product
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from aoc.intcode import Computer, ExecutionError, OpCode, ParamMode, restore_program
+from aoc.intcode.parallel import Patch, sweep
+
+Monomial = Tuple[int, ...]
+"Exponent of every symbol"
+
+
+class NotSymbolic(ExecutionError):
+    "The program does something its polynomial can't describe"
+
+
+class Polynomial:
+    "Polynomial with integer coefficients in a fixed number of symbols"
+
+    terms: Dict[Monomial, int]
+    "Coefficient of every monomial, zeros are left out"
+
+    def __init__(self, terms: Dict[Monomial, int]) -> NoReturn:
+        self.terms = {m: c for (m, c) in terms.items() if c}
+
+    @classmethod
+    def symbol(cls, index: int, symbols: int) -> "Polynomial":
+        return cls({tuple(int(i == index) for i in range(symbols)): 1})
+
+    @classmethod
+    def lift(cls, value: "Value", symbols: int) -> "Polynomial":
+        if isinstance(value, Polynomial):
+            return value
+        return cls({(0,) * symbols: value})
+
+    @property
+    def degree(self) -> int:
+        return max((sum(m) for m in self.terms), default=0)
+
+    def __add__(self, other: "Polynomial") -> "Polynomial":
+        terms = dict(self.terms)
+        for (m, c) in other.terms.items():
+            terms[m] = terms.get(m, 0) + c
+        return Polynomial(terms)
+
+    def __mul__(self, other: "Polynomial") -> "Polynomial":
+        terms: Dict[Monomial, int] = {}
+        for ((a, x), (b, y)) in product(self.terms.items(), other.terms.items()):
+            m = tuple(i + j for (i, j) in zip(a, b))
+            terms[m] = terms.get(m, 0) + x * y
+        return Polynomial(terms)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Polynomial):
+            return self.terms == other.terms
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Polynomial({self.terms})"
+
+    def evaluate(self, values: Sequence[int]) -> int:
+        total = 0
+        for (m, c) in self.terms.items():
+            for (value, power) in zip(values, m):
+                c *= value ** power
+            total += c
+        return total
+
+    def univariate(self, values: Sequence[int]) -> Dict[int, int]:
+        """
+        Returns the coefficients by power of the last symbol, given the values
+        of all the others
+        """
+        coefficients: Dict[int, int] = {}
+        for (m, c) in self.terms.items():
+            for (value, power) in zip(values, m[:-1]):
+                c *= value ** power
+            coefficients[m[-1]] = coefficients.get(m[-1], 0) + c
+        return coefficients
+
+
+Value = Union[int, Polynomial, None]
+"A cell, constant, polynomial in the symbols or unknown (None)"
+
+
+def _simplify(value: Polynomial) -> Value:
+    """Returns constant polynomials as plain ints"""
+    if value.degree == 0:
+        return sum(value.terms.values())
+    return value
+
+
+def _combine(op: OpCode, a: Value, b: Value, symbols: int) -> Value:
+    if a is None or b is None:
+        return None
+    if isinstance(a, int) and isinstance(b, int):
+        return a + b if op == OpCode.ADD else a * b
+    a, b = Polynomial.lift(a, symbols), Polynomial.lift(b, symbols)
+    return _simplify(a + b if op == OpCode.ADD else a * b)
+
+
+def _concrete(value: Value, what: str) -> int:
+    if not isinstance(value, int):
+        raise NotSymbolic(f"{what} depends on the symbols")
+    return value
+
+
+def execute(program: Iterable[int], symbols: Sequence[int]) -> List[Value]:
+    """
+    Runs `program` with the cells `symbols` replaced by symbols, returns the
+    memory it halts with
+
+    Raises `NotSymbolic` for anything but ADD, MUL and HALT, and whenever an
+    OpCode or write address depends on the symbols.
+    """
+    memory: List[Value] = list(program)
+    count = len(symbols)
+    for (i, cell) in enumerate(symbols):
+        memory[cell] = Polynomial.symbol(i, count)
+
+    def read(pos: int) -> Value:
+        if not 0 <= pos < len(memory):
+            raise ExecutionError("Invalid program, memory out of bounds")
+        return memory[pos]
+
+    pos = 0
+    # Every instruction moves on, so the program can't run longer than this
+    for _ in range(len(memory)):
+        code = _concrete(read(pos), f"Instruction at {pos}")
+        op = code % 100
+        if op == OpCode.HALT:
+            return memory
+        if op not in (OpCode.ADD, OpCode.MUL):
+            raise NotSymbolic(f"{op} at {pos} isn't supported")
+        args = []
+        for i in range(2):
+            param = read(pos + 1 + i)
+            if code // 10 ** (2 + i) % 10 == ParamMode.IMMEDIATE:
+                args.append(param)
+            elif isinstance(param, int):
+                args.append(read(param))
+            else:
+                # Could be any cell, only a problem if it's ever used
+                args.append(None)
+        if code // 10000 % 10 == ParamMode.IMMEDIATE:
+            target = pos + 3
+        else:
+            target = _concrete(read(pos + 3), f"Write address at {pos}")
+            read(target)
+        memory[target] = _combine(OpCode(op), *args, count)
+        pos += 4
+    raise NotSymbolic("Program doesn't halt")
+
+
+def solve(
+    polynomial: Polynomial, target: int, domains: Sequence[Iterable[int]]
+) -> Iterator[Tuple[int, ...]]:
+    """
+    Yields the values of the symbols, each taken from its domain, for which
+    `polynomial` equals `target`
+
+    Every combination of all but the last symbol is tried, the last one is
+    solved for directly when the polynomial is linear in it.
+    """
+    *outer, last = [tuple(domain) for domain in domains]
+    allowed = set(last)
+    for values in product(*outer):
+        coefficients = polynomial.univariate(values)
+        constant = coefficients.get(0, 0)
+        if max(coefficients, default=0) <= 1:
+            slope = coefficients.get(1, 0)
+            if slope == 0:
+                if constant == target:
+                    yield from (values + (x,) for x in last)
+            elif (target - constant) % slope == 0:
+                x = (target - constant) // slope
+                if x in allowed:
+                    yield values + (x,)
+        else:
+            for x in last:
+                total = sum(c * x ** p for (p, c) in coefficients.items())
+                if total == target:
+                    yield values + (x,)
+
+
+def _matches(program: Sequence[int], patch: Patch, cell: int, target: int) -> bool:
+    """Runs `program` with `patch` for real"""
+    memory = restore_program(patch, list(program))
+    computer = Computer(memory, engine="fast")
+    try:
+        computer.run_program()
+    except (ExecutionError, IndexError, ValueError):
+        return False
+    return computer.read(cell) == target
+
+
+def invert(
+    program: Iterable[int],
+    cells: Sequence[int],
+    target: int,
+    domains: Sequence[Iterable[int]],
+    output: int = 0,
+) -> Optional[Patch]:
+    """
+    Returns values for `cells`, from their `domains`, leaving `target` at
+    `output` once the program halts, or None if there aren't any
+
+    Raises `NotSymbolic` if the program can't be solved symbolically.
+    Solutions are checked by running the program once.
+    """
+    program = tuple(program)
+    result = execute(program, cells)[output]
+    if result is None:
+        raise NotSymbolic("Output depends on an unknown value")
+    if isinstance(result, int):
+        # Doesn't depend on the symbols at all
+        result = Polynomial.lift(result, len(cells))
+    for values in solve(result, target, domains):
+        patch = dict(zip(cells, values))
+        if _matches(program, patch, output, target):
+            return patch
+    return None
+
+
+@dataclass(frozen=True)
+class Leaves:
+    "Predicate for `sweep`, true when `cell` ends up holding `value`"
+
+    cell: int
+    value: int
+
+    def __call__(self, computer: Computer) -> bool:
+        return computer.read(self.cell) == self.value
+
+
+def find(
+    program: Iterable[int],
+    cells: Sequence[int],
+    target: int,
+    domains: Sequence[Iterable[int]],
+    output: int = 0,
+    workers: Optional[int] = None,
+) -> Optional[Patch]:
+    """
+    As `invert`, falling back to trying every combination of values with
+    `sweep` when the program isn't branch free
+    """
+    program = tuple(program)
+    domains = [tuple(domain) for domain in domains]
+    try:
+        return invert(program, cells, target, domains, output)
+    except NotSymbolic:
+        pass
+    patches = (dict(zip(cells, values)) for values in product(*domains))
+    return sweep(program, patches, Leaves(output, target), workers=workers)
@@ -0,0 +1,199 @@
+"""
+Structured execution traces of IntCode programs
+
+A `Tracer` attached to a `Computer` gets one `TraceRecord` per executed
+instruction: where it was, the instruction and its raw parameters, and the cell
+it wrote (if any) with the value written. The latest records are kept in a ring
+buffer and every record can also be streamed to a file, either as NDJSON or in
+a compact fixed size binary format.
+
+Traces can be loaded back, `replay`ed onto a memory image to reconstruct the
+state at any step and `diff`ed to find where two runs diverge.
+"""
+import json
+import struct
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    MutableSequence,
+    NoReturn,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from aoc.intcode import OpCode, op_table
+
+RECORD = struct.Struct("<7q")
+"pos, code, three parameters (zero padded), address and value (-1 and 0 if none)"
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    "One executed instruction"
+
+    pos: int
+    code: int
+    "The instruction cell, OpCode and parameter modes"
+
+    params: Tuple[int, ...]
+    "Raw parameter cells as they were when executed"
+
+    addr: Optional[int] = None
+    "Cell written by the instruction"
+
+    value: Optional[int] = None
+    "Value written to `addr`"
+
+    @property
+    def op(self) -> OpCode:
+        return OpCode(self.code % 100)
+
+    def to_json(self) -> str:
+        data = {"pos": self.pos, "code": self.code, "params": list(self.params)}
+        if self.addr is not None:
+            data.update(addr=self.addr, value=self.value)
+        return json.dumps(data, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str) -> "TraceRecord":
+        data = json.loads(line)
+        return cls(
+            data["pos"],
+            data["code"],
+            tuple(data["params"]),
+            data.get("addr"),
+            data.get("value"),
+        )
+
+    def pack(self) -> bytes:
+        params = (tuple(self.params) + (0, 0, 0))[:3]
+        if self.addr is None:
+            return RECORD.pack(self.pos, self.code, *params, -1, 0)
+        return RECORD.pack(self.pos, self.code, *params, self.addr, self.value)
+
+    @classmethod
+    def unpack(cls, buffer: bytes, arity: int) -> "TraceRecord":
+        pos, code, *params, addr, value = RECORD.unpack(buffer)
+        if addr < 0:
+            return cls(pos, code, tuple(params[:arity]))
+        return cls(pos, code, tuple(params[:arity]), addr, value)
+
+
+class Tracer:
+    """
+    Ring buffer of the latest `capacity` records, optionally writing every
+    record to `path` as well
+
+    Use as a context manager, or `close` it, to flush the file.
+    """
+
+    records: Deque[TraceRecord]
+    binary: bool
+
+    def __init__(
+        self,
+        capacity: Optional[int] = 10_000,
+        path: Optional[Union[str, Path]] = None,
+        binary: bool = False,
+    ) -> NoReturn:
+        self.records = deque(maxlen=capacity)
+        self.binary = binary
+        self.__file = None
+        if path is not None:
+            self.__file = open(path, "wb" if binary else "w")
+
+    def record(self, record: TraceRecord) -> NoReturn:
+        self.records.append(record)
+        if self.__file is not None:
+            if self.binary:
+                self.__file.write(record.pack())
+            else:
+                self.__file.write(record.to_json() + "\n")
+
+    def dump(self, path: Union[str, Path], binary: bool = False) -> NoReturn:
+        """Writes the records in the ring buffer to `path`"""
+        save(self.records, path, binary)
+
+    def close(self) -> NoReturn:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __enter__(self) -> "Tracer":
+        return self
+
+    def __exit__(self, *exc_info) -> NoReturn:
+        self.close()
+
+    def __iter__(self) -> Iterator[TraceRecord]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def save(
+    records: Iterable[TraceRecord], path: Union[str, Path], binary: bool = False
+) -> NoReturn:
+    """Writes `records` to `path` as NDJSON, or packed when `binary`"""
+    if binary:
+        with open(path, "wb") as f:
+            f.writelines(record.pack() for record in records)
+    else:
+        with open(path, "w") as f:
+            f.writelines(record.to_json() + "\n" for record in records)
+
+
+def load(path: Union[str, Path], binary: bool = False) -> List[TraceRecord]:
+    """Reads a trace written by `Tracer` or `save`"""
+    if not binary:
+        with open(path) as f:
+            return [TraceRecord.from_json(line) for line in f if line.strip()]
+    records = []
+    with open(path, "rb") as f:
+        while chunk := f.read(RECORD.size):
+            code = RECORD.unpack(chunk)[1]
+            records.append(TraceRecord.unpack(chunk, op_table[code % 100].arity))
+    return records
+
+
+def replay(
+    memory: MutableSequence[int], records: Iterable[TraceRecord]
+) -> MutableSequence[int]:
+    """
+    Applies the writes of `records` to `memory`, in place
+
+    Starting from the image a trace was recorded on, this gives the memory as
+    it was after the last of `records`.
+    """
+    for record in records:
+        if record.addr is not None:
+            memory[record.addr] = record.value
+    return memory
+
+
+def diff(
+    a: Sequence[TraceRecord], b: Sequence[TraceRecord]
+) -> Optional[Tuple[int, Optional[TraceRecord], Optional[TraceRecord]]]:
+    """
+    Returns the step where two traces first differ along with the records of
+    each at that step (`None` for the one which ended), or `None` if identical
+    """
+    for (step, (x, y)) in enumerate(zip(a, b)):
+        if x != y:
+            return step, x, y
+    if len(a) != len(b):
+        step = min(len(a), len(b))
+        return (
+            step,
+            a[step] if step < len(a) else None,
+            b[step] if step < len(b) else None,
+        )
+    return None
@@ -0,0 +1,13 @@
+"""
+Benchmarks for the IntCode computer
+
+Reproducible workloads (see `benchmarks.workloads`) timed for every execution
+engine, with results written as JSON and compared against a stored baseline.
+
+    python -m benchmarks --out results.json
+    python -m benchmarks --baseline baseline.json --threshold 0.1
+    python -m benchmarks --save-baseline baseline.json
+
+Exits non zero when any workload got slower than the baseline by more than
+the threshold.
+"""
@@ -0,0 +1,58 @@
+import argparse
+import sys
+
+from aoc.intcode import ENGINES
+from benchmarks import runner
+from benchmarks.workloads import WORKLOADS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Benchmarks IntCode engines"
+    )
+    parser.add_argument(
+        "--workloads", nargs="+", choices=WORKLOADS, default=list(WORKLOADS)
+    )
+    parser.add_argument(
+        "--engines", nargs="+", choices=ENGINES, default=list(ENGINES)
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing")
+    parser.add_argument("--out", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results in this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Slowdown counted as a regression, 0.1 is 10%% (default)",
+    )
+    parser.add_argument("--save-baseline", help="Write results as a new baseline")
+    args = parser.parse_args()
+
+    baseline = runner.load(args.baseline) if args.baseline else {}
+    results = runner.run(args.workloads, args.engines, args.repeat)
+
+    print(f"{'workload':<24}{'engine':<10}{'best':>10}{'median':>10}{'Minstr/s':>10}")
+    for result in results:
+        line = (
+            f"{result.workload:<24}{result.engine:<10}"
+            f"{result.best * 1e3:>8.2f}ms{result.median * 1e3:>8.2f}ms"
+            f"{result.ips / 1e6:>10.2f}"
+        )
+        if (before := baseline.get(result.key)) is not None:
+            line += f"  {result.best / before.best - 1:+.1%}"
+        print(line)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            runner.save(results, path)
+
+    if regressions := runner.compare(baseline, results, args.threshold):
+        print(f"\nRegressions over {args.threshold:.0%}:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Timing workloads and comparing results against a baseline
+"""
+import json
+import platform
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Dict, Iterable, List, Union
+
+from aoc.intcode import ENGINES
+from aoc.intcode.profiler import Profiler
+from benchmarks.workloads import WORKLOADS
+
+
+@dataclass(frozen=True)
+class Result:
+    "Timings of one workload on one engine"
+
+    workload: str
+    engine: str
+    instructions: int
+    best: float
+    "Fastest run, in seconds"
+
+    median: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.workload}/{self.engine}"
+
+    @property
+    def ips(self) -> float:
+        "Instructions per second of the fastest run"
+        return self.instructions / self.best
+
+
+def count_instructions(workload: str) -> int:
+    """Returns the number of instructions `workload` executes"""
+    profiler = Profiler()
+    WORKLOADS[workload]("naive", profiler)
+    return profiler.instructions
+
+
+def run(
+    workloads: Iterable[str] = WORKLOADS,
+    engines: Iterable[str] = ENGINES,
+    repeat: int = 5,
+) -> List[Result]:
+    """Times every workload on every engine `repeat` times"""
+    results = []
+    for workload in workloads:
+        instructions = count_instructions(workload)
+        for engine in engines:
+            timings = []
+            for _ in range(repeat):
+                start = perf_counter()
+                WORKLOADS[workload](engine, None)
+                timings.append(perf_counter() - start)
+            results.append(
+                Result(workload, engine, instructions, min(timings), median(timings))
+            )
+    return results
+
+
+def to_json(results: Iterable[Result]) -> Dict:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {
+            result.key: {**asdict(result), "ips": result.ips} for result in results
+        },
+    }
+
+
+def save(results: Iterable[Result], path: Union[str, Path]) -> None:
+    Path(path).write_text(json.dumps(to_json(results), indent=2) + "\n")
+
+
+def load(path: Union[str, Path]) -> Dict[str, Result]:
+    """Reads results written by `save`, keyed by workload and engine"""
+    data = json.loads(Path(path).read_text())["results"]
+    return {
+        key: Result(**{name: entry[name] for name in Result.__dataclass_fields__})
+        for (key, entry) in data.items()
+    }
+
+
+def compare(
+    baseline: Dict[str, Result], results: Iterable[Result], threshold: float = 0.1
+) -> List[str]:
+    """
+    Returns a description of every result slower than its baseline by more
+    than `threshold` (a fraction, 0.1 is 10%)
+
+    Best times are compared, results missing from the baseline are skipped.
+    """
+    regressions = []
+    for result in results:
+        if (before := baseline.get(result.key)) is None:
+            continue
+        change = result.best / before.best - 1
+        if change > threshold:
+            regressions.append(
+                f"{result.key}: {before.best * 1e3:.2f}ms -> "
+                f"{result.best * 1e3:.2f}ms ({change:+.1%})"
+            )
+    return regressions
@@ -0,0 +1,84 @@
+"""
+Benchmark workloads
+
+Each workload runs a fixed amount of IntCode on one engine. They take an
+optional `Profiler`, which every computer they create reports to, so the
+number of instructions they execute can be counted once up front.
+"""
+from itertools import permutations, product
+from typing import Callable, Dict, NoReturn, Optional
+
+from aoc.day_02.seed import p1 as day_02_seed
+from aoc.day_05.seed import p1 as day_05_seed
+from aoc.intcode import Computer, QueuedIO, restore_program
+from aoc.intcode.compiler import compile_program
+from aoc.intcode.profiler import Profiler
+
+Workload = Callable[[str, Optional[Profiler]], NoReturn]
+"Runs the workload on an engine, reporting to the profiler if given"
+
+# fmt: off
+# Day 7 example, max thruster signal 65210 from phase settings 1,0,4,3,2
+DAY_07_EXAMPLE = (
+    3,31,3,32,1002,32,10,32,1001,31,-2,31,1007,31,0,33,
+    1002,33,7,33,1,33,31,31,1,32,31,31,4,31,99,0,0,0,
+)
+
+# Counts memory[20] down to zero, accumulating 3 * memory[20] in memory[21]
+LOOP = (
+    1002, 20, 3, 22,
+    1, 21, 22, 21,
+    1001, 20, -1, 20,
+    1005, 20, 0,
+    99,
+    0, 0, 0, 0, 20_000, 0, 0,
+)
+# fmt: on
+
+
+def day_05(engine: str, profiler: Optional[Profiler] = None) -> NoReturn:
+    """Both parts of the day 5 diagnostic program"""
+    for stdin in (1, 5):
+        Computer(
+            list(day_05_seed), io=QueuedIO((stdin,)), engine=engine, profiler=profiler
+        ).run_program()
+
+
+def day_02_sweep(engine: str, profiler: Optional[Profiler] = None) -> NoReturn:
+    """Every noun and verb of day 2, 10 000 runs of a short program"""
+    program = compile_program(day_02_seed, variable=(1, 2))
+    for (noun, verb) in product(range(100), repeat=2):
+        memory = restore_program({1: noun, 2: verb}, list(day_02_seed))
+        Computer(
+            memory, engine=engine, program=program, profiler=profiler
+        ).run_program()
+
+
+def day_07_permutations(
+    engine: str, profiler: Optional[Profiler] = None
+) -> NoReturn:
+    """Amplifier chains for all 120 phase settings of a day 7 example"""
+    for phases in permutations(range(5)):
+        signal = 0
+        for phase in phases:
+            c = Computer(
+                list(DAY_07_EXAMPLE),
+                io=QueuedIO((phase, signal)),
+                engine=engine,
+                profiler=profiler,
+            )
+            c.run_program()
+            signal = c.io.stdout[-1]
+
+
+def long_loop(engine: str, profiler: Optional[Profiler] = None) -> NoReturn:
+    """A four instruction loop running 20 000 times"""
+    Computer(list(LOOP), engine=engine, profiler=profiler).run_program()
+
+
+WORKLOADS: Dict[str, Workload] = {
+    "day_05": day_05,
+    "day_02_sweep": day_02_sweep,
+    "day_07_permutations": day_07_permutations,
+    "long_loop": long_loop,
+}
@@ -0,0 +1,29 @@
+from benchmarks import runner
+from benchmarks.runner import Result
+
+
+def test_run_and_round_trip(tmp_path):
+    results = runner.run(["day_05"], ["fast"], repeat=1)
+    (result,) = results
+    assert result.key == "day_05/fast"
+    assert result.instructions == runner.count_instructions("day_05") > 0
+    assert result.ips > 0
+
+    path = tmp_path / "results.json"
+    runner.save(results, path)
+    assert runner.load(path) == {"day_05/fast": result}
+
+
+def test_compare():
+    baseline = {
+        "a/fast": Result("a", "fast", 100, best=1.0, median=1.0),
+        "b/fast": Result("b", "fast", 100, best=1.0, median=1.0),
+    }
+    results = [
+        Result("a", "fast", 100, best=1.05, median=1.1),
+        Result("b", "fast", 100, best=1.5, median=1.5),
+        Result("c", "fast", 100, best=9.0, median=9.0),
+    ]
+    (regression,) = runner.compare(baseline, results, threshold=0.1)
+    assert regression.startswith("b/fast")
+    assert runner.compare(baseline, results, threshold=0.6) == []
@@ -5,6 +5,8 @@ from hypothesis import given
 import hypothesis.strategies as st
 
 from aoc.day_05.core import part_1, part_2, run_io_program
+from aoc.day_05.seed import p1
+from aoc.intcode import ENGINES
 
 MAX_SIGNED_8BIT = 0b_1111_1111 // 2  # 127
 MIN_SIGNED_8BIT = -0b_1111_1111 // 2  # -128
@@ -87,10 +89,21 @@ def test_parts():
     assert part_2() == 7704130
 
 
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines(engine: str):
+    assert run_io_program(p1, (1,), engine=engine) == 12896948
+    assert run_io_program(p1, (5,), engine=engine) == 7704130
+
+
 # Hypothesis generate stdin
 @given(stdin=st.integers(min_value=MIN_SIGNED_8BIT, max_value=MAX_SIGNED_8BIT))
 @pytest.mark.parametrize("data,expected,msg", test_programs)
+@pytest.mark.parametrize("engine", ENGINES)
 def test_io_program(
-    data: Iterable[int], expected: Callable[[int], int], stdin: int, msg: str
+    data: Iterable[int],
+    expected: Callable[[int], int],
+    stdin: int,
+    msg: str,
+    engine: str,
 ) -> NoReturn:
-    assert run_io_program(data, (stdin,)) == expected(stdin), msg
+    assert run_io_program(data, (stdin,), engine=engine) == expected(stdin), msg
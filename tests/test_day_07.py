@@ -3,9 +3,13 @@ from typing import Iterable
 import pytest
 
 from aoc.day_07.core import (
+    FEEDBACK_PHASES,
+    SERIES_PHASES,
+    Amplifiers,
     part_1,
     part_2,
 )
+from aoc.intcode import ENGINES
 
 # Here are some example programs:
 test_programs = (
@@ -40,13 +44,63 @@ test_programs = (
 )
 
 
+# Feedback loop examples
+feedback_programs = (
+    (
+        # Max thruster signal 139629729 (from phase setting sequence 9,8,7,6,5):
+        139629729,
+        (9, 8, 7, 6, 5),
+        (
+            # fmt: off
+            3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,
+            27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5
+            # fmt: on
+        ),
+    ),
+    (
+        # Max thruster signal 18216 (from phase setting sequence 9,7,8,5,6):
+        18216,
+        (9, 7, 8, 5, 6),
+        (
+            # fmt: off
+            3,52,1001,52,-5,52,3,53,1,52,56,54,1007,54,5,55,1005,55,26,1001,54,
+            -5,54,1105,1,12,1,53,54,53,1008,54,0,55,1001,55,1,55,2,53,55,53,4,
+            53,1001,56,-1,56,1005,56,6,99,0,0,0,0,10
+            # fmt: on
+        ),
+    ),
+)
+
+
 def test_parts():
-    # Oracle says so
-    assert part_1() == 0
-    assert part_2() == 0
-    assert True
+    (signal, _, program) = test_programs[0]
+    assert part_1(program) == signal
+    (signal, _, program) = feedback_programs[0]
+    assert part_2(program) == signal
 
 
+@pytest.mark.parametrize("engine", ENGINES)
 @pytest.mark.parametrize("signal,sequence,program", test_programs)
-def test_max_thruster(signal: int, sequence: Iterable[int], program: Iterable[int]):
-    assert True
+def test_max_thruster(
+    signal: int, sequence: Iterable[int], program: Iterable[int], engine: str
+):
+    amplifiers = Amplifiers(program, engine)
+    assert amplifiers.series(sequence) == signal
+    assert amplifiers.best(SERIES_PHASES) == (signal, sequence)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("signal,sequence,program", feedback_programs)
+def test_feedback_loop(
+    signal: int, sequence: Iterable[int], program: Iterable[int], engine: str
+):
+    amplifiers = Amplifiers(program, engine)
+    assert amplifiers.feedback(sequence) == signal
+    assert amplifiers.best(FEEDBACK_PHASES, feedback=True) == (signal, sequence)
+
+
+def test_shared_prefixes():
+    amplifiers = Amplifiers(test_programs[0][2])
+    amplifiers.best(SERIES_PHASES)
+    # One amplifier per distinct prefix rather than five per order
+    assert amplifiers.search.runs == 5 + 5 * 4 + 5 * 4 * 3 + 5 * 4 * 3 * 2 + 120
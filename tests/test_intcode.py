@@ -0,0 +1,274 @@
+from itertools import cycle
+
+import pytest
+
+from aoc.day_02.seed import p1 as day_02_seed
+from aoc.intcode import (
+    Computer,
+    ENGINES,
+    OpCode,
+    QueuedIO,
+    State,
+    op_table,
+    restore_program,
+)
+from aoc.intcode.profiler import Profiler
+
+
+def test_decode_cache_reused_in_loop():
+    # Counts memory[13] down from 3, the loop body is only decoded once
+    program = [1001, 13, -1, 13, 1005, 13, 0, 99, 0, 0, 0, 0, 0, 3]
+    c = Computer(program)
+    c.run_program()
+    assert c.read(13) == 0
+    assert sorted(c.cache.entries) == [0, 4, 7]
+
+
+def test_write_invalidates_cache():
+    c = Computer([1, 0, 0, 0, 99])
+    c.run_program()
+    assert c.read(0) == 2
+    c.write(0, 2)
+    c.pos = 0
+    c.run_program()
+    assert c.read(0) == 4
+
+
+def test_replaced_memory_drops_cache():
+    c = Computer([1, 5, 6, 7, 99, 1, 2, 0])
+    c.run_program()
+    assert c.read(7) == 3
+    c.memory = [1, 5, 6, 7, 99, 10, 20, 0]
+    c.pos = 0
+    c.run_program()
+    assert c.read(7) == 30
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_rerun_patched_memory(engine: str):
+    c = Computer([1, 5, 6, 7, 99, 3, 4, 0], engine=engine)
+    c.run_program()
+    assert c.read(7) == 7
+    c.memory[0] = 2
+    c.rerun_program()
+    assert c.read(7) == 12
+
+
+def test_fused_pairs():
+    # Counts memory[13] down from 3, ADD and JMPT are dispatched as one
+    program = [1001, 13, -1, 13, 1005, 13, 0, 99, 0, 0, 0, 0, 0, 3]
+    c = Computer(list(program))
+    assert c.run_for(2) == State.READY
+    assert c.cache.entries[0].op == (OpCode.ADD, OpCode.JMPT)
+    assert c.read(13) == 2
+
+    # Retargeting the jump rolls the pair back
+    c.write(6, 7)
+    assert 0 not in c.cache.entries
+    assert c.run_program()
+    assert c.read(13) == 1
+    assert c.pos == 7
+
+    unfused = Computer(list(program), fusion=False)
+    unfused.run_program()
+    assert all(isinstance(d.op, OpCode) for d in unfused.cache.entries.values())
+
+
+def test_no_fusion_into_patched_instruction():
+    # The ADD sets the condition of the JMPT right after it
+    c = Computer([1101, 1, 1, 5, 1105, 0, 9, 99, 0, 99])
+    assert c.run_program()
+    assert c.pos == 9
+    assert c.cache.entries[0].op == OpCode.ADD
+
+
+def test_no_fusion_into_truncated_instruction():
+    # The ADD turns 11101, which doesn't fit in memory, into an input
+    c = Computer([1, 5, 2, 4, 11101, 1, 99], io=QueuedIO([9]))
+    assert c.run_program()
+    assert c.memory == [1, 9, 2, 4, 3, 1, 99]
+
+
+def test_op_table():
+    assert {op: spec.arity for (op, spec) in op_table.items()} == {
+        OpCode.ADD: 3,
+        OpCode.MUL: 3,
+        OpCode.MOVS: 1,
+        OpCode.OUT: 1,
+        OpCode.JMPT: 2,
+        OpCode.JMPF: 2,
+        OpCode.LT: 3,
+        OpCode.EQ: 3,
+        OpCode.HALT: 0,
+    }
+    assert op_table[OpCode.OUT].io_param == "io"
+    assert op_table[OpCode.ADD].io_param is None
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_day_02_programs(engine: str):
+    examples = (
+        ((1, 0, 0, 0, 99), (2, 0, 0, 0, 99)),
+        ((2, 3, 0, 3, 99), (2, 3, 0, 6, 99)),
+        ((2, 4, 4, 5, 99, 0), (2, 4, 4, 5, 99, 9801)),
+        ((1, 1, 1, 4, 99, 5, 6, 0, 99), (30, 1, 1, 4, 2, 5, 6, 0, 99)),
+    )
+    for (program, mem_out) in examples:
+        c = Computer(list(program), engine=engine)
+        assert c.run_program()
+        assert c.memory == list(mem_out)
+
+    for (noun, verb, expected) in ((12, 2, 9581917), (25, 5, 19_690_720)):
+        program = restore_program({1: noun, 2: verb}, list(day_02_seed))
+        c = Computer(program, engine=engine)
+        c.run_program()
+        assert c.read(0) == expected
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engine_self_modifying(engine: str):
+    # fmt: off
+    program = [
+        1, 16, 17, 18,
+        1101, 0, 2, 0,
+        1001, 19, -1, 19,
+        1006, 19, 0,
+        99,
+        3, 5, 0, 1,
+    ]
+    # fmt: on
+    c = Computer(program, engine=engine)
+    c.run_program()
+    assert c.read(18) == 15
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_invalid_modes(engine: str):
+    c = Computer([201, 5, 6, 7, 99, 0, 0, 0], engine=engine)
+    with pytest.raises(ValueError, match="2 is not a valid ParamMode"):
+        c.run_program()
+    assert c.read(7) == 0
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("code", [11003, 1199])
+def test_modes_beyond_arity(engine: str, code: int):
+    c = Computer([code, 0], engine=engine)
+    with pytest.raises(ValueError, match=f"{code} has modes for parameters"):
+        c.run_program()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_negative_op_code(engine: str):
+    # Would be a HALT modulo 100
+    c = Computer([-1, 0], engine=engine)
+    with pytest.raises(ValueError, match="-1 is not a valid OpCode"):
+        c.run_program()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_snapshot_and_fork(engine: str):
+    c = Computer(restore_program({1: 12, 2: 2}, list(day_02_seed)), engine=engine)
+    snapshot = c.snapshot()
+    fork = c.fork()
+    fork.write(2, 3)
+
+    c.run_program()
+    assert c.read(0) == 9581917
+    fork.run_program()
+    assert fork.read(0) != 9581917
+
+    c.restore(snapshot)
+    assert c.read(0) == 1
+    assert c.pos == 0
+    assert c.rerun_program()
+    assert c.read(0) == 9581917
+    # Snapshots aren't affected by running a restored computer
+    assert snapshot.memory[0] == 1
+
+
+def test_snapshot_keeps_memory():
+    memory = [1, 0, 0, 0, 99]
+    c = Computer(memory)
+    snapshot = c.snapshot()
+    c.fork()
+    assert c.memory is memory
+    c.run_program()
+    assert memory[0] == 2
+    assert snapshot.memory[0] == 1
+
+
+def test_fork_keeps_options():
+    profiler = Profiler()
+    c = Computer([1, 0, 0, 0, 99], engine="fast", fusion=False, profiler=profiler)
+    c.run_for(1)
+    fork = c.fork()
+    assert fork.engine == "fast"
+    assert not fork.fusion
+    assert fork.profiler is profiler
+    assert fork.instructions == 1
+
+
+# Day 7 pt 2 example, max thruster signal 139629729 from phases 9,8,7,6,5
+# fmt: off
+FEEDBACK_PROGRAM = (
+    3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,
+    27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5
+)
+# fmt: on
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_suspend_on_input(engine: str):
+    io = QueuedIO()
+    program = [3, 11, 3, 12, 1, 11, 12, 13, 4, 13, 99, 0, 0, 0]
+    c = Computer(program, io=io, engine=engine)
+    assert not c.run_program()
+    assert c.state == State.WAITING
+    assert c.pos == 0
+    io.stdin.append(2)
+    assert c.run_until_input() == State.WAITING
+    assert c.pos == 2
+    io.stdin.append(3)
+    assert c.run_until_input() == State.HALTED
+    assert list(io.stdout) == [5]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_feedback_loop(engine: str):
+    amplifiers = []
+    for phase in (9, 8, 7, 6, 5):
+        io = QueuedIO((phase,))
+        amplifier = Computer(list(FEEDBACK_PROGRAM), io=io, engine=engine)
+        amplifiers.append((amplifier, io))
+
+    signal = 0
+    for (amplifier, io) in cycle(amplifiers):
+        io.stdin.append(signal)
+        if amplifier.run_until_output() == State.HALTED:
+            break
+        signal = io.stdout.popleft()
+    assert signal == 139629729
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_execute_generator(engine: str):
+    io = QueuedIO()
+    c = Computer([3, 9, 4, 9, 104, 7, 1105, 1, 0, 0], io=io, engine=engine)
+    steps = c.execute()
+    assert next(steps) == State.WAITING
+    io.stdin.append(5)
+    assert next(steps) == State.READY
+    assert next(steps) == State.READY
+    assert list(io.stdout) == [5, 7]
+    assert next(steps) == State.WAITING
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_for(engine: str):
+    # Counts memory[16] up by one forever
+    c = Computer([1001, 16, 1, 16, 1105, 1, 0] + [0] * 10, engine=engine)
+    assert c.run_for(100) == State.READY
+    assert 0 < c.read(16) <= 50
+    assert c.run_for(100) == State.READY
+    assert 50 < c.read(16) <= 100
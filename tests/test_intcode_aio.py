@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from aoc.intcode import ENGINES, ExecutionError, QueuedIO
+from aoc.intcode.aio import AsyncComputer
+from tests.test_intcode import FEEDBACK_PROGRAM
+
+# Reads a value, writes it back incremented by one, then halts
+INCREMENT = (3, 9, 1001, 9, 1, 9, 4, 9, 99, 0)
+
+# Spins forever
+BUSY_LOOP = (1105, 1, 0)
+
+
+def wire(programs, ring=False, **kwargs):
+    """Returns machines connected stdout to stdin in order"""
+    machines = [AsyncComputer(list(programs[0]), **kwargs)]
+    for program in programs[1:]:
+        stdin = machines[-1].stdout
+        machines.append(AsyncComputer(list(program), stdin=stdin, **kwargs))
+    if ring:
+        machines[-1].stdout = machines[0].stdin
+    return machines
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_feedback_ring(engine: str):
+    async def main():
+        machines = wire([FEEDBACK_PROGRAM] * 5, ring=True, engine=engine)
+        for (machine, phase) in zip(machines, (9, 8, 7, 6, 5)):
+            machine.stdin.put_nowait(phase)
+        machines[0].stdin.put_nowait(0)
+        await asyncio.gather(*(machine.run() for machine in machines))
+        return machines[-1].stdout.get_nowait()
+
+    assert asyncio.run(main()) == 139629729
+
+
+def test_thousand_machine_pipeline():
+    async def main():
+        machines = wire([INCREMENT] * 1000, engine="fast")
+        machines[0].stdin.put_nowait(0)
+        assert all(await asyncio.gather(*(machine.run() for machine in machines)))
+        return machines[-1].stdout.get_nowait()
+
+    assert asyncio.run(main()) == 1000
+
+
+def test_busy_machine_does_not_starve_others():
+    async def main():
+        busy = AsyncComputer(list(BUSY_LOOP), engine="fast", quantum=100)
+        machine = AsyncComputer(list(INCREMENT), engine="fast", quantum=100)
+        spinning = asyncio.ensure_future(busy.run())
+        machine.stdin.put_nowait(41)
+        assert await machine.run()
+        spinning.cancel()
+        return machine.stdout.get_nowait()
+
+    assert asyncio.run(main()) == 42
+
+
+def test_created_outside_loop():
+    # Its queues would be bound to the wrong loop on older Pythons
+    with pytest.raises(ExecutionError):
+        AsyncComputer(list(INCREMENT))
+
+
+def test_io_is_not_accepted():
+    async def main():
+        AsyncComputer(list(INCREMENT), io=QueuedIO([1]))
+
+    with pytest.raises(TypeError):
+        asyncio.run(main())
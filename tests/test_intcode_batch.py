@@ -0,0 +1,50 @@
+import pytest
+
+from aoc.day_02.seed import p1 as day_02_seed
+from tests.test_day_05 import test_programs
+
+np = pytest.importorskip("numpy")
+
+from aoc.intcode.batch import BatchComputer, LaneState  # noqa: E402
+
+
+def test_day_02_sweep():
+    nouns, verbs = np.divmod(np.arange(100 * 100), 100)
+    memory = np.tile(np.array(day_02_seed), (nouns.size, 1))
+    memory[:, 1] = nouns
+    memory[:, 2] = verbs
+    c = BatchComputer(memory)
+    assert c.run_program().all()
+    (match,) = np.flatnonzero(c.read(0) == 19_690_720)
+    assert 100 * nouns[match] + verbs[match] == 2505
+    assert c.read(0)[12 * 100 + 2] == 9581917
+
+
+@pytest.mark.parametrize("data,expected,msg", test_programs)
+def test_io_programs(data, expected, msg):
+    stdin = np.arange(-20, 20)
+    c = BatchComputer(np.tile(np.array(data), (stdin.size, 1)), stdin=stdin)
+    assert c.run_program().all()
+    for (lane, value) in enumerate(stdin):
+        assert list(c.output(lane)) == [expected(value)], msg
+
+
+def test_lanes_retire_individually():
+    memory = np.array(
+        [
+            [3, 0, 4, 0, 99],  # Echo
+            [3, 0, 3, 0, 99],  # Reads more than given
+            [3, 0, 55, 0, 99],  # Invalid OpCode
+            [3, 0, 4, 50, 99],  # Outside of memory
+        ]
+    )
+    c = BatchComputer(memory, stdin=[7, 7, 7, 7])
+    assert list(c.run_program()) == [True, False, False, False]
+    assert list(c.state) == [
+        LaneState.HALTED,
+        LaneState.WAITING,
+        LaneState.FAILED,
+        LaneState.FAILED,
+    ]
+    assert list(c.output(0)) == [7]
+    assert list(c.pos) == [4, 2, 2, 2]
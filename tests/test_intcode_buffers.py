@@ -0,0 +1,82 @@
+import io
+from array import array
+
+import pytest
+
+from aoc.day_05.seed import p1 as DAY_05_SEED
+from aoc.intcode import ENGINES, Computer, State
+from aoc.intcode.buffers import BufferedIO, TerminalIO
+
+# fmt: off
+# Writes memory[10] - 1 down to 0
+COUNTDOWN = [
+    1001, 10, -1, 10,  # 0: ADD [10], -1, [10]
+    4, 10,             # 4: OUT [10]
+    1005, 10, 0,       # 6: JMPT [10], 0
+    99,                # 9: HALT
+    5,
+]
+# fmt: on
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bulk_output(engine: str):
+    device = BufferedIO()
+    Computer(list(COUNTDOWN), io=device, engine=engine).run_program()
+    assert device.pending == 5
+    first = device.read_many(2)
+    assert isinstance(first, memoryview)
+    assert first.tolist() == [4, 3]
+    assert device.drain().tolist() == [2, 1, 0]
+    assert device.pending == 0
+    # Views handed out stay valid as more output is written
+    device.write(7)
+    assert first.tolist() == [4, 3]
+    assert list(device.drain()) == [7]
+
+
+def test_drain_joins_output():
+    device = BufferedIO()
+    for value in range(4):
+        device.write(value)
+    assert list(device.read_many(1)) == [0]
+    device.write(2 ** 70)
+    assert list(device.drain()) == [1, 2, 3, 2 ** 70]
+
+
+def test_input_in_place():
+    stdin = array("q", (5,))
+    device = BufferedIO(stdin)
+    computer = Computer(list(DAY_05_SEED), io=device, engine="fast")
+    assert computer.run_program()
+    assert list(device.drain())[-1] == 7704130
+    assert len(device) == 0
+
+    # Feeding copies rather than growing the caller's buffer
+    device.feed((1, 2))
+    assert list(stdin) == [5]
+    assert (device.read(), device.read()) == (1, 2)
+
+
+def test_suspend_and_snapshot():
+    device = BufferedIO()
+    computer = Computer([3, 7, 4, 7, 1105, 1, 0, 0], io=device, engine="fast")
+    assert computer.run_until_input() == State.WAITING
+    snapshot = computer.snapshot()
+    device.feed((1, 2))
+    computer.run_until_input()
+    assert list(device.drain()) == [1, 2]
+    computer.restore(snapshot)
+    computer.io.feed((3,))
+    computer.run_until_input()
+    assert list(computer.io.drain()) == [3]
+
+
+def test_terminal_batches():
+    stream = io.StringIO()
+    device = TerminalIO(batch=3, stream=stream)
+    with device:
+        for value in range(4):
+            device.write(value)
+        assert stream.getvalue() == "STDOUT:\n0\nSTDOUT:\n1\nSTDOUT:\n2\n"
+    assert stream.getvalue().endswith("STDOUT:\n3\n")
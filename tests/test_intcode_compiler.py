@@ -0,0 +1,106 @@
+import pytest
+
+from aoc.day_02.seed import p1 as day_02_seed
+from aoc.intcode import Computer, QueuedIO, State, restore_program
+from aoc.intcode.compiler import compile_program
+
+# Counts memory[20] down to zero, accumulating 3 * memory[20] in memory[21]
+# fmt: off
+LOOP = (
+    1002, 20, 3, 22,
+    1, 21, 22, 21,
+    1001, 20, -1, 20,
+    1005, 20, 0,
+    99,
+    0, 0, 0, 0, 10, 0, 0,
+)
+# fmt: on
+
+
+def test_compiled_program_is_cached():
+    assert compile_program(LOOP) is compile_program(list(LOOP))
+
+    c = Computer(list(LOOP), engine="compiled")
+    assert c.run_program()
+    assert c.read(21) == 165
+    assert c.pos == 15
+
+    blocks = dict(compile_program(LOOP).blocks)
+    c = Computer(list(LOOP), engine="compiled")
+    c.run_program()
+    assert c.read(21) == 165
+    # Nothing decoded or compiled the second time around
+    assert compile_program(LOOP).blocks == blocks
+
+
+def test_immediates_are_folded():
+    program = compile_program((1101, 2, 3, 5, 99, 0))
+    assert "m[5] = 5" in program.block(0).source
+
+
+def test_variable_cells():
+    program = compile_program(day_02_seed, variable=(1, 2))
+    for (noun, verb, expected) in ((12, 2, 9581917), (25, 5, 19_690_720)):
+        memory = restore_program({1: noun, 2: verb}, list(day_02_seed))
+        c = Computer(memory, engine="compiled", program=program)
+        c.run_program()
+        assert c.read(0) == expected
+    assert "m[m[1]]" in program.block(0).source
+
+
+def test_patched_memory_falls_back():
+    # Same image, but instruction 0 is patched from ADD into MUL before running
+    program = compile_program((1, 5, 6, 0, 99, 3, 4))
+    Computer([1, 5, 6, 0, 99, 3, 4], engine="compiled", program=program).run_program()
+    c = Computer([2, 5, 6, 0, 99, 3, 4], engine="compiled", program=program)
+    c.run_program()
+    assert c.read(0) == 12
+
+
+def test_constant_branches():
+    # JMPT 0 is never taken and JMPF 0 always is, only the halt ends the block
+    # fmt: off
+    program = compile_program((
+        1105, 0, 99,
+        1101, 2, 3, 13,
+        1106, 0, 12,
+        99,
+        99,
+        99,
+        0,
+    ))
+    # fmt: on
+    block = program.block(0)
+    assert block.end == 10
+    assert block.length == 3
+    assert block.safe
+    c = Computer(list(program.image), engine="compiled", program=program)
+    assert c.run_program()
+    assert c.pos == 12
+    assert c.read(13) == 5
+
+
+# Writes into cells of blocks before they're first compiled
+# fmt: off
+WRITES_AHEAD = (
+    3,10,1,5,6,28,10101,37,8,19,1002,34,5,9,4,8,1105,26,26,3,23,3,23,
+    11101,26,7,38,106,35,6,103,2,1101,28,39,1,99,
+)
+# fmt: on
+
+
+def test_blocks_compiled_after_writes():
+    expected = Computer(list(WRITES_AHEAD), io=QueuedIO([3, 22, 12]))
+    expected.run_program()
+    assert expected.state == State.WAITING
+    # Twice, the second run starts with every block compiled
+    for _ in range(2):
+        c = Computer(list(WRITES_AHEAD), io=QueuedIO([3, 22, 12]), engine="compiled")
+        c.run_program()
+        assert (c.state, c.pos, c.memory) == (State.WAITING, 10, expected.memory)
+
+
+def test_invalid_code_is_reported():
+    c = Computer([10099], engine="compiled")
+    with pytest.raises(ValueError, match="10099 has modes for parameters HALT"):
+        c.run_program()
@@ -0,0 +1,67 @@
+import pytest
+
+from aoc.intcode import ENGINES, Computer, QueuedIO, State
+from aoc.intcode.debug import Monitor, Stop
+
+from tests.test_intcode_scheduler import COUNTDOWN
+
+
+def monitored(engine: str) -> Computer:
+    return Computer(list(COUNTDOWN), io=QueuedIO(), engine=engine, monitor=Monitor())
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_breakpoint(engine: str):
+    computer = monitored(engine)
+    computer.monitor.break_at(4)
+    assert computer.run_program() is False
+    assert computer.state == State.STOPPED
+    hit = computer.monitor.hit
+    assert (hit.stop, hit.pos, hit.instructions) == (Stop.BREAKPOINT, 4, 1)
+    # Resuming runs on past the breakpoint, once round the loop
+    assert computer.run_until_input() == State.STOPPED
+    assert computer.monitor.hit.instructions == 3
+    assert computer.read(9) == 998
+
+    computer.monitor.clear()
+    assert computer.run_program()
+    assert computer.instructions == 2001
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_watchpoint(engine: str):
+    computer = monitored(engine)
+    computer.monitor.watch(9, lambda value: value == 500)
+    assert computer.run_until_input() == State.STOPPED
+    hit = computer.monitor.hit
+    assert (hit.stop, hit.pos, hit.cell, hit.value) == (Stop.WATCHPOINT, 4, 9, 500)
+    snapshot = computer.snapshot()
+
+    assert computer.run_program()
+    computer.restore(snapshot)
+    assert computer.read(9) == 500
+    computer.monitor.watch(9)
+    assert computer.run_until_input() == State.STOPPED
+    assert computer.monitor.hit.value == 499
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_interrupt(engine: str):
+    computer = monitored(engine)
+    computer.monitor.interrupt_after(computer, 100)
+    assert computer.run_until_input() == State.STOPPED
+    # Compiled blocks run whole, they may overshoot
+    assert 100 <= computer.instructions <= 102
+    assert computer.monitor.hit.stop == Stop.INTERRUPT
+    assert computer.monitor.interrupt is None
+    assert computer.run_program()
+    assert computer.monitor.hit is None
+
+
+def test_interrupt_keeps_engine():
+    computer = monitored("fast")
+    computer.monitor.interrupt_after(computer, 100)
+    computer.run_until_input()
+    assert computer.instructions == 100
+    # The checked loop would have filled the decode cache
+    assert not computer.cache.entries
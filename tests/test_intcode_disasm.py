@@ -0,0 +1,65 @@
+from aoc.day_05.seed import p1 as day_05_seed
+from aoc.intcode.disasm import analyze, disassemble
+
+from tests.test_intcode_compiler import LOOP
+
+# fmt: off
+# Folds 2 + 3 into cell 13, always jumps over the dead MUL to the halt
+BRANCHY = (
+    1101, 2, 3, 13,    # 0: ADD 2, 3, [13]
+    1105, 1, 12,       # 4: JMPT 1, 12
+    1102, 0, 0, 13,    # 7: MUL 0, 0, [13] (dead)
+    99,                # 11: HALT (dead)
+    99,                # 12: HALT
+    0,
+)
+
+# Patches the instruction at 8 from ADD into MUL before running it
+PATCHING = (
+    1101, 1, 1, 8,     # 0: ADD 1, 1, [8]
+    1105, 1, 8, 0,     # 4: JMPT 1, 8
+    1, 13, 13, 13,     # 8: ADD [13], [13], [13], patched into MUL
+    99,
+    3,
+)
+# fmt: on
+
+
+def test_listing():
+    listing = disassemble(BRANCHY)
+    assert "ADD 2, 3, [13]" in listing
+    assert "; = 5" in listing
+    assert "always taken" in listing
+    assert "DATA 1102, 0, 0, 13, 99" in listing
+
+
+def test_control_flow_graph():
+    analysis = analyze(LOOP)
+    assert analysis.complete
+    assert set(analysis.blocks) == {0, 15}
+    assert analysis.blocks[0].successors == {0, 15}
+    assert analysis.blocks[0].end == 15
+    assert not analysis.blocks[15].successors
+    assert analysis.writes == {0: 22, 4: 21, 8: 20}
+
+
+def test_dead_code_and_safe_cells():
+    analysis = analyze(BRANCHY)
+    assert analysis.complete
+    assert analysis.branches == {4: True}
+    assert analysis.folds == {0: 5}
+    assert analysis.dead == {7, 11}
+    assert analysis.safe == set(range(7)) | {12}
+
+
+def test_self_modifying():
+    analysis = analyze(PATCHING)
+    assert analysis.self_modifying == {0: 8}
+    assert analysis.patched == {8}
+    assert not analysis.complete
+    assert not analysis.safe and not analysis.dead
+    assert "patched at run time" in analysis.listing()
+
+
+def test_analysis_is_cached():
+    assert analyze(day_05_seed) is analyze(list(day_05_seed))
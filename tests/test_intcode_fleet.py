@@ -0,0 +1,65 @@
+from array import array
+
+import pytest
+
+from aoc.intcode import ExecutionError, State
+from aoc.intcode.fleet import Fleet, Machine, RingBuffer, place
+
+from tests.test_intcode import FEEDBACK_PROGRAM
+from tests.test_intcode_scheduler import COUNTDOWN
+
+
+def ring(capacity: int) -> RingBuffer:
+    words = array("q", [0] * RingBuffer.words(capacity))
+    return RingBuffer(memoryview(words), capacity)
+
+
+def test_ring_buffer():
+    buffer = ring(3)
+    assert buffer.put(1, 10)
+    assert buffer.put(2, -20)
+    assert buffer.drain() == [(1, 10), (2, -20)]
+    # Wraps around the end of the slots
+    assert all(buffer.put(i, i * i) for i in range(3))
+    assert not buffer.put(4, 0)
+    assert len(buffer) == 3
+    assert buffer.drain() == [(0, 0), (1, 1), (2, 4)]
+    assert buffer.drain() == []
+    with pytest.raises(ExecutionError):
+        buffer.put(0, 2 ** 64)
+
+
+def test_placement():
+    # Two rings of four and four loners on four shards
+    links = {0: 1, 1: 2, 2: 3, 3: 0, 4: 5, 5: 6, 6: 7, 7: 4}
+    shard_of = place(12, links, 4)
+    assert sorted(shard_of.count(s) for s in range(4)) == [3, 3, 3, 3]
+    crossing = [s for (s, d) in links.items() if shard_of[s] != shard_of[d]]
+    # Each ring is cut once into two runs of neighbours
+    assert len(crossing) == 4
+
+
+def test_feedback_across_shards():
+    fleet = Fleet(shards=2, quantum=5, capacity=2)
+    ids = [
+        fleet.add(Machine(FEEDBACK_PROGRAM, stdin))
+        for stdin in ((9, 0), (8,), (7,), (6,), (5,))
+    ]
+    for (source, destination) in zip(ids, ids[1:] + ids[:1]):
+        fleet.connect(source, destination)
+    assert len(set(fleet.place())) == 2
+
+    results = fleet.run()
+    assert all(result.state == State.HALTED for result in results.values())
+    first, last = results[ids[0]], results[ids[-1]]
+    assert first.stdin + last.stdout == (139629729,)
+
+
+def test_independent_machines():
+    fleet = Fleet(shards=2)
+    for _ in range(6):
+        fleet.add(Machine(COUNTDOWN))
+    results = fleet.run()
+    assert {result.shard for result in results.values()} == {0, 1}
+    assert all(result.state == State.HALTED for result in results.values())
+    assert all(result.instructions == 2001 for result in results.values())
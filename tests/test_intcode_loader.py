@@ -0,0 +1,54 @@
+import pytest
+
+from aoc.day_05.seed import p1 as DAY_05_SEED
+from aoc.intcode import Computer, ExecutionError, QueuedIO
+from aoc.intcode.loader import (
+    dump_text,
+    load,
+    load_image,
+    map_image,
+    parse,
+    save_image,
+)
+from aoc.intcode.memory import ArrayMemory
+
+
+def test_parse():
+    assert parse("1,0,0,3,99\n") == [1, 0, 0, 3, 99]
+    assert parse(" 1, -2,\t3 ") == [1, -2, 3]
+    assert parse("\n") == []
+    with pytest.raises(ExecutionError):
+        parse("1,,2")
+
+
+def test_image_round_trip(tmp_path):
+    path = tmp_path / "day_05.icp"
+    save_image(DAY_05_SEED, path)
+    assert load_image(path).tolist() == list(DAY_05_SEED)
+    assert list(map_image(path)) == list(DAY_05_SEED)
+    assert load(path) == list(DAY_05_SEED)
+
+    text = tmp_path / "day_05.txt"
+    dump_text(DAY_05_SEED, text)
+    assert load(text) == list(DAY_05_SEED)
+
+
+def test_run_mapped_image(tmp_path):
+    path = tmp_path / "day_05.icp"
+    save_image(DAY_05_SEED, path)
+    io = QueuedIO((5,))
+    Computer(ArrayMemory(map_image(path)), io=io, engine="fast").run_program()
+    assert io.stdout.pop() == 7704130
+
+
+def test_invalid_images(tmp_path):
+    path = tmp_path / "image"
+    with pytest.raises(ExecutionError):
+        save_image([2 ** 64], path)
+    path.write_bytes(b"1,2,3")
+    with pytest.raises(ExecutionError):
+        load_image(path)
+    save_image(range(10), path)
+    path.write_bytes(path.read_bytes()[:-8])
+    with pytest.raises(ExecutionError):
+        map_image(path)
@@ -0,0 +1,46 @@
+from aoc.day_05.core import run_io_program
+from aoc.day_05.seed import p1
+from aoc.intcode import Computer, QueuedIO, State
+from aoc.intcode.memo import ResultCache
+
+
+def test_repeated_runs_hit():
+    cache = ResultCache()
+    assert run_io_program(p1, (5,), cache=cache) == 7704130
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert run_io_program(p1, (5,), cache=cache) == 7704130
+    assert run_io_program(p1, (1,), cache=cache) == 12896948
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_hit_restores_state():
+    cache = ResultCache()
+    program = [3, 9, 3, 10, 1, 9, 10, 11, 4, 11, 99, 0, 0, 0]
+    for _ in range(2):
+        io = QueuedIO((2,))
+        memory = list(program)
+        c = Computer(memory, io=io)
+        assert not cache.run(c)
+        assert c.state == State.WAITING
+        assert c.pos == 2
+        assert not io.stdin
+        assert memory[9] == 2
+    assert cache.hits == 1
+
+
+def test_lru_eviction():
+    cache = ResultCache(maxsize=2)
+    for stdin in (1, 2, 3, 1):
+        assert run_io_program((3, 0, 4, 0, 99), (stdin,), cache=cache) == stdin
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+def test_disk_backend(tmp_path):
+    path = tmp_path / "cache" / "results.sqlite"
+    run_io_program(p1, (5,), cache=ResultCache(path=path))
+    cache = ResultCache(path=path)
+    assert run_io_program(p1, (5,), cache=cache) == 7704130
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.clear()
+    assert ResultCache(path=path).get("missing") is None
@@ -0,0 +1,106 @@
+import sys
+
+import pytest
+
+from aoc.day_05.seed import p1 as DAY_05_SEED
+from aoc.intcode import ENGINES, Computer, QueuedIO
+from aoc.intcode.memory import (
+    PAGE_SIZE,
+    ArrayMemory,
+    Memory,
+    PagedMemory,
+    SparseMemory,
+)
+
+
+def test_paged_memory():
+    data = list(range(3 * PAGE_SIZE + 10))
+    memory = PagedMemory(data)
+    assert len(memory) == len(data)
+    assert memory == data
+    assert memory[PAGE_SIZE + 1] == PAGE_SIZE + 1
+    assert memory[-1] == data[-1]
+    assert memory[PAGE_SIZE - 2 : PAGE_SIZE + 2] == data[PAGE_SIZE - 2 : PAGE_SIZE + 2]
+    with pytest.raises(IndexError):
+        memory[len(data)]
+    with pytest.raises(TypeError):
+        memory.append(1)
+
+
+def test_fork_copies_on_write():
+    memory = PagedMemory(range(3 * PAGE_SIZE))
+    fork = memory.fork()
+    assert all(a is b for (a, b) in zip(memory.pages, fork.pages))
+
+    fork[PAGE_SIZE] = -1
+    assert fork[PAGE_SIZE] == -1
+    assert memory[PAGE_SIZE] == PAGE_SIZE
+    # Only the written page got copied
+    assert [a is b for (a, b) in zip(memory.pages, fork.pages)] == [True, False, True]
+
+    memory[0] = -2
+    assert fork[0] == 0
+
+
+def test_array_memory():
+    data = list(range(1000))
+    memory = ArrayMemory(data)
+    assert memory == data
+    assert memory[10:13] == [10, 11, 12]
+    # One machine word per cell rather than a pointer to a boxed int
+    assert memory.data.itemsize == 8
+    boxed = sys.getsizeof(data) + sum(map(sys.getsizeof, data))
+    assert sys.getsizeof(memory.data) < boxed / 3
+
+    fork = memory.fork()
+    fork[0] = -1
+    assert memory[0] == 0
+    with pytest.raises(TypeError):
+        memory.insert(0, 1)
+
+
+def test_array_memory_promotes_on_overflow():
+    memory = ArrayMemory([1, 2, 3])
+    memory[1] = 2 ** 63 - 1
+    assert not memory.promoted
+    memory[1] *= 2
+    assert memory.promoted
+    assert memory == [1, 2 ** 64 - 2, 3]
+    assert ArrayMemory([2 ** 70]).promoted
+
+
+def test_sparse_memory():
+    memory = SparseMemory(ArrayMemory([1, 2, 3]))
+    assert memory[100_000] == 0
+    assert len(memory) == 3
+
+    memory[100_000] = 7
+    assert memory[100_000] == 7
+    assert len(memory) == 100_001
+    assert memory.extra == {100_000: 7}
+    with pytest.raises(IndexError):
+        memory[-1]
+
+    fork = memory.fork()
+    fork[0] = fork[100_000] = -1
+    assert memory[0] == 1 and memory[100_000] == 7
+
+
+@pytest.mark.parametrize("backend", [ArrayMemory, PagedMemory, SparseMemory])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_backends_run_programs(backend, engine):
+    c = Computer(backend(DAY_05_SEED), io=QueuedIO([5]), engine=engine)
+    assert c.run_program()
+    assert list(c.io.stdout) == [7_704_130]
+
+    fork = Computer(backend(DAY_05_SEED), io=QueuedIO([1]), engine=engine).fork()
+    assert fork.run_program()
+    assert list(fork.io.stdout)[-1] == 12_896_948
+
+
+def test_memory_needs_fork():
+    class Unforkable(Memory):
+        __getitem__ = __setitem__ = __len__ = None
+
+    with pytest.raises(TypeError):
+        Unforkable()
@@ -0,0 +1,39 @@
+from aoc.day_02.core import TARGET
+from aoc.day_02.seed import p1 as day_02_seed
+from aoc.intcode import Computer, sweep
+from aoc.intcode.symbolic import Leaves
+
+
+def never(computer: Computer) -> bool:
+    return False
+
+
+def outputs_square(computer: Computer) -> bool:
+    return computer.io.stdout[-1] == 49
+
+
+def test_sweep():
+    candidates = ({1: noun, 2: verb} for noun in range(100) for verb in range(100))
+    match = sweep(day_02_seed, candidates, Leaves(0, TARGET), workers=2)
+    assert match == {1: 25, 2: 5}
+
+
+def test_sweep_without_match():
+    candidates = ({1: noun, 2: 0} for noun in range(20))
+    assert sweep(day_02_seed, candidates, never, workers=2, chunksize=3) is None
+
+
+def test_sweep_with_stdin():
+    # Multiplies input with the immediate in cell 3
+    program = (3, 9, 1002, 9, 0, 9, 4, 9, 99, 0)
+    candidates = ({4: factor} for factor in range(20))
+    assert sweep(program, candidates, outputs_square, stdin=(7,)) == {4: 7}
+
+
+def test_sweep_skips_faults():
+    # Adds two cells into cell 0, jumps to 8 and halts there only if that's 10.
+    # Addresses past the end and cells which aren't instructions fault
+    program = (1, 0, 0, 0, 1105, 1, 8, 99, 99, 5)
+    candidates = ({1: a, 2: b} for a in range(20) for b in range(20))
+    match = sweep(program, candidates, Leaves(0, 10), workers=2, chunksize=7)
+    assert match == {1: 6, 2: 2}
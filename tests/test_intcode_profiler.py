@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from aoc.day_05.seed import p1
+from aoc.intcode import ENGINES, Computer, OpCode, QueuedIO, State
+from aoc.intcode.profiler import Profiler, format_instruction
+
+# fmt: off
+# Counts cell 20 down from 3, the jump at 9 is taken twice then falls through
+COUNTDOWN = [
+    1001, 20, -1, 20,  # 0: ADD [20], -1, [20]
+    4, 20,             # 4: OUT [20]
+    1008, 20, 0, 21,   # 6: EQ [20], 0, [21]
+    1006, 21, 0,       # 10: JMPF [21], 0
+    99,                # 13: HALT
+    0, 0, 0, 0, 0, 0,
+    3, 0,
+]
+# fmt: on
+
+
+def test_format_instruction():
+    assert format_instruction(COUNTDOWN, 0) == "ADD [20], -1, [20]"
+    assert format_instruction(COUNTDOWN, 10) == "JMPF [21], 0"
+    assert format_instruction(COUNTDOWN, 13) == "HALT"
+    assert format_instruction(COUNTDOWN, 14) == "???"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_counts(engine):
+    profiler = Profiler()
+    c = Computer(list(COUNTDOWN), io=QueuedIO(), engine=engine, profiler=profiler)
+    assert c.run_program()
+    assert list(c.io.stdout) == [2, 1, 0]
+    assert profiler.addresses == {0: 3, 4: 3, 6: 3, 10: 3, 13: 1}
+    assert profiler.ops[OpCode.ADD] == 3
+    assert profiler.ops[OpCode.HALT] == 1
+    assert profiler.instructions == 13
+    assert profiler.branches == {10: [2, 1]}
+
+
+def test_suspended_time_counts_as_io():
+    profiler = Profiler()
+    c = Computer([3, 0, 99], io=QueuedIO(), profiler=profiler)
+    assert c.run_until_input() == State.WAITING
+    assert profiler.instructions == 0
+    c.io.stdin.append(1)
+    assert c.run_program()
+    assert profiler.addresses == {0: 1, 2: 1}
+    assert profiler.io_wait > 0
+
+
+def test_report():
+    profiler = Profiler()
+    c = Computer(list(p1), io=QueuedIO((5,)), profiler=profiler)
+    assert c.run_program()
+
+    data = json.loads(profiler.to_json(c.memory, top=3))
+    assert data["instructions"] == profiler.instructions
+    assert len(data["hot"]) == 3
+    assert sum(data["ops"].values()) == profiler.instructions
+
+    report = profiler.report(c.memory, top=3)
+    assert f"{profiler.instructions} instructions" in report
+    assert data["hot"][0]["instruction"] in report
@@ -0,0 +1,93 @@
+import pytest
+
+from aoc.intcode import ENGINES, Computer, ExecutionError, QueuedIO, State
+from aoc.intcode.scheduler import Priority, Scheduler
+
+from tests.test_intcode import FEEDBACK_PROGRAM
+
+# Counts memory[9] down to zero, two instructions per round
+COUNTDOWN = (1001, 9, -1, 9, 1005, 9, 0, 99, 0, 1000)
+
+
+def countdown() -> Computer:
+    return Computer(list(COUNTDOWN), io=QueuedIO(), engine="fast")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_feedback_loop(engine: str):
+    scheduler = Scheduler(quantum=5)
+    pids = [
+        scheduler.spawn(
+            Computer(list(FEEDBACK_PROGRAM), io=QueuedIO((phase,)), engine=engine)
+        )
+        for phase in (9, 8, 7, 6, 5)
+    ]
+    for (source, destination) in zip(pids, pids[1:] + pids[:1]):
+        scheduler.connect(source, destination)
+    scheduler.send(pids[0], 0)
+
+    assert scheduler.run()
+    # The last signal is either still with the last amplifier, or delivered to
+    # the first one if it hadn't quite halted yet
+    first, last = (scheduler.finished[pid].computer.io for pid in (pids[0], pids[-1]))
+    assert list(first.stdin) + list(last.stdout) == [139629729]
+
+
+def test_parks_until_input():
+    scheduler = Scheduler()
+    pid = scheduler.spawn(Computer([3, 5, 4, 5, 99, 0], io=QueuedIO()))
+    assert not scheduler.run()
+    assert scheduler.parked() == [pid]
+    assert scheduler.tasks[pid].state == State.WAITING
+
+    scheduler.send(pid, 42)
+    assert scheduler.parked() == []
+    assert scheduler.run()
+    assert list(scheduler.finished[pid].computer.io.stdout) == [42]
+
+
+def test_priorities():
+    scheduler = Scheduler(quantum=100)
+    low = scheduler.spawn(countdown(), tenant="batch", priority=Priority.LOW)
+    high = scheduler.spawn(countdown(), tenant="interactive", priority=Priority.HIGH)
+    while high in scheduler.tasks:
+        assert scheduler.step()
+    assert scheduler.accounts["batch"].instructions == 0
+    assert scheduler.run()
+    assert low in scheduler.finished
+
+
+def test_round_robin_accounting():
+    scheduler = Scheduler(quantum=100)
+    for tenant in ("a", "b", "b"):
+        scheduler.spawn(countdown(), tenant=tenant)
+    for _ in range(9):
+        scheduler.step()
+    a, b = scheduler.accounts["a"], scheduler.accounts["b"]
+    assert (a.slices, b.slices) == (3, 6)
+    assert (a.instructions, b.instructions) == (300, 600)
+
+    assert scheduler.run()
+    machines = scheduler.finished.values()
+    assert a.instructions + b.instructions == sum(
+        task.computer.instructions for task in machines
+    )
+    assert a.wall_time > 0 and b.wall_time > 0
+
+
+def test_needs_queued_io():
+    with pytest.raises(ExecutionError):
+        Scheduler().spawn(Computer([99]))
+
+
+def test_failing_task():
+    scheduler = Scheduler(quantum=5)
+    # Not an OpCode
+    broken = scheduler.spawn(Computer([98], io=QueuedIO()))
+    other = scheduler.spawn(countdown())
+    with pytest.raises(ValueError):
+        scheduler.run()
+    assert list(scheduler.failed) == [broken]
+    # The others carry on
+    assert not scheduler.run()
+    assert list(scheduler.finished) == [other]
@@ -0,0 +1,50 @@
+from itertools import permutations
+
+import pytest
+
+from aoc.intcode import ENGINES, Computer, QueuedIO
+from aoc.intcode.search import PhaseSearch
+
+from tests.test_day_07 import feedback_programs, test_programs
+
+PREFIXES = 5 + 5 * 4 + 5 * 4 * 3 + 5 * 4 * 3 * 2 + 5 * 4 * 3 * 2 * 1
+
+
+def search(program, engine: str = "fast") -> PhaseSearch:
+    return PhaseSearch(
+        lambda phase: Computer(list(program), io=QueuedIO((phase,)), engine=engine)
+    )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("signal,sequence,program", test_programs)
+def test_series(signal: int, sequence, program, engine: str):
+    tree = search(program, engine)
+    assert tree.series(range(5)) == (signal, sequence)
+    assert tree.runs == PREFIXES
+    # Everything is memoized now
+    assert tree.chain(sequence) == signal
+    assert tree.series(range(5)) == (signal, sequence)
+    assert tree.runs == PREFIXES
+
+
+def test_wider_alphabet():
+    program = test_programs[2][2]
+    tree = search(program)
+    brute = search(program)
+    expected = max((brute.chain(order), order) for order in permutations(range(7), 3))
+    assert tree.series(range(7), width=3) == expected
+    assert tree.runs == 7 + 7 * 6 + 7 * 6 * 5
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("signal,sequence,program", feedback_programs)
+def test_feedback(signal: int, sequence, program, engine: str):
+    tree = search(program, engine)
+    assert tree.feedback(range(5, 10)) == (signal, sequence)
+    assert tree.runs == PREFIXES
+    assert tree.forks == 120 * 4
+
+    brute = search(program, engine)
+    orders = permutations(range(5, 10))
+    assert max((brute.loop(order), order) for order in orders) == (signal, sequence)
@@ -0,0 +1,81 @@
+import os
+from array import array
+from itertools import count
+
+import pytest
+
+from aoc.intcode import ENGINES, Computer, State
+from aoc.intcode.streams import (
+    FileSink,
+    FileSource,
+    GeneratorSource,
+    MappedSource,
+    Sink,
+    Source,
+    StreamIO,
+)
+
+# Doubles every value read, forever
+DOUBLER = (3, 11, 1002, 11, 2, 11, 4, 11, 1105, 1, 0, 0)
+
+
+def packed(values) -> bytes:
+    return array("q", values).tobytes()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_generator_to_sink(engine: str):
+    batches = []
+    sink = Sink(batches.append, capacity=100)
+    with StreamIO(GeneratorSource(range(1050), read_ahead=64), sink) as device:
+        computer = Computer(list(DOUBLER), io=device, engine=engine)
+        assert computer.run_until_input() == State.WAITING
+        assert len(sink) == 50
+    assert [len(batch) for batch in batches] == [100] * 10 + [50]
+    assert sum(batches, []) == [2 * i for i in range(1050)]
+
+
+def test_endless_generator():
+    batches = []
+    device = StreamIO(GeneratorSource(count()), Sink(batches.append, capacity=10))
+    computer = Computer(list(DOUBLER), io=device, engine="fast")
+    # Four instructions per value
+    computer.run_for(4 * 25)
+    assert batches == [list(range(0, 20, 2)), list(range(20, 40, 2))]
+
+
+def test_file_source_and_sink():
+    source_read, source_write = os.pipe()
+    sink_read, sink_write = os.pipe()
+    os.write(source_write, packed(range(10))[:-3])
+    device = StreamIO(FileSource(source_read, read_ahead=4), FileSink(sink_write, 4))
+    computer = Computer(list(DOUBLER), io=device, engine="fast")
+
+    # The last word only arrives in part, the computer waits for the rest
+    os.set_blocking(source_read, False)
+    assert computer.run_until_input() == State.WAITING
+    os.write(source_write, packed([9])[-3:])
+    os.close(source_write)
+    assert computer.run_until_input() == State.WAITING
+    device.flush()
+    os.close(sink_write)
+    with os.fdopen(sink_read, "rb") as f:
+        assert array("q", f.read()).tolist() == [2 * i for i in range(10)]
+    os.close(source_read)
+
+
+def test_mapped_source(tmp_path):
+    path = tmp_path / "stdin"
+    path.write_bytes(packed(range(100)))
+    batches = []
+    with StreamIO(MappedSource(path, read_ahead=7), Sink(batches.append)) as device:
+        Computer(list(DOUBLER), io=device, engine="compiled").run_program()
+    assert batches == [[2 * i for i in range(100)]]
+
+
+def test_source_needs_fill():
+    class Empty(Source):
+        pass
+
+    with pytest.raises(TypeError):
+        Empty()
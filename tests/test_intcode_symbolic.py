@@ -0,0 +1,61 @@
+import pytest
+
+from aoc.day_02.core import TARGET
+from aoc.day_02.seed import p1 as DAY_02_SEED
+from aoc.day_05.seed import p1 as DAY_05_SEED
+from aoc.intcode.symbolic import NotSymbolic, Polynomial, execute, find, invert, solve
+
+NOUN, VERB = Polynomial.symbol(0, 2), Polynomial.symbol(1, 2)
+
+# fmt: off
+# Leaves noun * verb in cell 0, after adding two cells it reads by symbolic
+# address into cell 3, which is never used. Padded so any address is valid
+SQUARE = (
+    1, 0, 0, 3,
+    2, 1, 2, 0,
+    99,
+) + (0,) * 100
+# fmt: on
+
+
+def test_polynomial():
+    p = NOUN * NOUN + Polynomial.lift(3, 2) * VERB + Polynomial.lift(-1, 2)
+    assert p.degree == 2
+    assert p.evaluate((4, 5)) == 30
+    assert p.univariate((4,)) == {0: 15, 1: 3}
+
+
+def test_day_02():
+    memory = execute(DAY_02_SEED, (1, 2))
+    (a, b, c) = (memory[0].terms[m] for m in ((1, 0), (0, 1), (0, 0)))
+    assert memory[0] == Polynomial({(1, 0): a, (0, 1): b, (0, 0): c})
+    domain = range(100)
+    assert invert(DAY_02_SEED, (1, 2), TARGET, (domain, domain)) == {1: 25, 2: 5}
+    assert invert(DAY_02_SEED, (1, 2), -1, (domain, domain)) is None
+
+
+def test_noun_equals_verb():
+    memory = execute(SQUARE, (1, 2))
+    assert memory[0] == NOUN * VERB
+    assert memory[3] is None
+    assert list(solve(memory[0], 6, (range(10), range(10)))) == [
+        (1, 6),
+        (2, 3),
+        (3, 2),
+        (6, 1),
+    ]
+    domain = range(100)
+    assert invert(SQUARE, (1, 2), 9801, (domain, domain)) == {1: 99, 2: 99}
+
+
+def test_fallback():
+    with pytest.raises(NotSymbolic):
+        execute(DAY_05_SEED, (1, 2))
+    # Reads through both symbols into the output, only sweeping can tell
+    program = (2, 0, 0, 0, 99)
+    with pytest.raises(NotSymbolic):
+        invert(program, (1, 2), 9801, (range(5), range(5)))
+    assert find(program, (1, 2), 9801, (range(5), range(5)), workers=1) == {
+        1: 4,
+        2: 4,
+    }
@@ -0,0 +1,50 @@
+import pytest
+
+from aoc.day_05.seed import p1
+from aoc.intcode import Computer, OpCode, QueuedIO
+from aoc.intcode.trace import TraceRecord, Tracer, diff, load, replay
+
+
+def traced(stdin, **kwargs) -> Computer:
+    c = Computer(list(p1), io=QueuedIO(stdin), tracer=Tracer(**kwargs))
+    assert c.run_program()
+    return c
+
+
+def test_records():
+    c = Computer([1, 0, 0, 0, 3, 7, 99, 0], io=QueuedIO((5,)), tracer=Tracer())
+    assert c.run_program()
+    assert list(c.tracer) == [
+        TraceRecord(0, 1, (0, 0, 0), 0, 2),
+        TraceRecord(4, 3, (7,), 7, 5),
+        TraceRecord(6, 99, ()),
+    ]
+    assert c.tracer.records[0].op == OpCode.ADD
+
+
+def test_ring_buffer():
+    c = traced((5,), capacity=10)
+    assert len(c.tracer) == 10
+    assert c.tracer.records[-1].op == OpCode.HALT
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_file_round_trip(tmp_path, binary):
+    path = tmp_path / "trace"
+    with Tracer(capacity=None, path=path, binary=binary) as tracer:
+        c = Computer(list(p1), io=QueuedIO((5,)), tracer=tracer)
+        assert c.run_program()
+    records = load(path, binary=binary)
+    assert records == list(tracer)
+    assert replay(list(p1), records) == c.memory
+
+
+def test_diff():
+    a = list(traced((5,), capacity=None).tracer)
+    b = list(traced((1,), capacity=None).tracer)
+    assert diff(a, a) is None
+    step, x, y = diff(a, b)
+    assert a[:step] == b[:step]
+    assert (x.op, y.op) == (OpCode.MOVS, OpCode.MOVS)
+    assert (x.value, y.value) == (5, 1)
+    assert diff(a, a[:-1]) == (len(a) - 1, a[-1], None)